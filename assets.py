@@ -0,0 +1,144 @@
+import os
+import hashlib
+
+from PySide6.QtCore import Qt, QSize
+from PySide6.QtGui import QColor, QImage, QImageReader, QPixmap
+
+import catalog
+import images
+
+store = 'assets'
+chunk_size = 1 << 20
+preview_size = 4  # The preview is preview_size x preview_size RGB pixels, stored as hex
+variants = {
+    'icon': (70, 70, Qt.KeepAspectRatio),
+    'card': (300, 300, Qt.KeepAspectRatioByExpanding),
+    'background': (1920, 1080, Qt.KeepAspectRatioByExpanding)
+}
+# (table, key, path column, asset column, variant)
+references = [
+    ('folder_cards', 'folder_id', 'icon_path', 'icon_asset', 'icon'),
+    ('folder_cards', 'folder_id', 'banner_path', 'banner_asset', 'background'),
+    ('app_cards', 'app_id', 'background_path', 'background_asset', 'card')
+]
+
+
+def content_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def variant_path(asset_id, variant):
+    return os.path.join(store, asset_id[:2], f'{asset_id}-{variant}.png')
+
+
+def render(path, asset_id, variant):
+    # Decodes straight to the variant size, images smaller than the variant are kept as they are
+    target = variant_path(asset_id, variant)
+    if os.path.exists(target):
+        return True
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    width, height, mode = variants[variant]
+    size = reader.size()
+    if size.isValid():
+        scaled = size.scaled(width, height, mode)
+        if scaled.width() < size.width():
+            reader.setScaledSize(scaled)
+    image = reader.read()
+    if image.isNull():
+        print(f'[assets] Cannot read {path}: {reader.errorString()}')
+        return False
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    return image.save(target)
+
+
+def describe(path, image):
+    # Colour, source size and a tiny preview, enough for a card to paint a placeholder without decoding
+    size = QImageReader(path).size()
+    image = image.convertToFormat(QImage.Format_RGB888)
+    color = image.scaled(1, 1, Qt.IgnoreAspectRatio, Qt.SmoothTransformation).pixelColor(0, 0).name()
+    small = image.scaled(preview_size, preview_size, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+    preview = ''.join(small.pixelColor(x, y).name()[1:] for y in range(preview_size) for x in range(preview_size))
+    return color, size.width(), size.height(), preview
+
+
+def ingest(conn, path, variant):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    cursor = conn.cursor()
+    cursor.execute("select asset_id from asset_sources where path = ? and size = ? and mtime = ?",
+                   (path, stat.st_size, stat.st_mtime))
+    row = cursor.fetchone()
+    asset_id = row[0] if row else content_hash(path)
+    if not render(path, asset_id, variant):
+        return None
+    cursor.execute("insert or ignore into assets (asset_id) values (?)", (asset_id,))
+    cursor.execute("select preview from assets where asset_id = ?", (asset_id,))
+    if cursor.fetchone()[0] is None:
+        image = QImage(variant_path(asset_id, variant))
+        if not image.isNull():
+            cursor.execute("update assets set color = ?, width = ?, height = ?, preview = ? where asset_id = ?",
+                           (*describe(path, image), asset_id))
+    cursor.execute("insert or replace into asset_sources (path, size, mtime, asset_id) values (?, ?, ?, ?)",
+                   (path, stat.st_size, stat.st_mtime, asset_id))
+    return asset_id
+
+
+def sync(db_path='data.db', full=False, progress=None):
+    # Ingests every referenced image without an asset, or with full, rechecks every path for changes
+    conn = catalog.connect(db_path)
+    changed = 0
+    try:
+        for table, key, path_column, asset_column, variant in references:
+            condition = f"{path_column} is not null" + ('' if full else f" and {asset_column} is null")
+            paths = [row[0] for row in conn.execute(f"select distinct {path_column} from {table} where {condition}")]
+            for i, path in enumerate(paths):
+                asset_id = ingest(conn, path, variant)
+                cursor = conn.execute(f"update {table} set {asset_column} = ? "
+                                      f"where {path_column} = ? and {asset_column} is not ?",
+                                      (asset_id, path, asset_id))
+                changed += cursor.rowcount
+                conn.commit()
+                if progress is not None:
+                    progress(i + 1, len(paths))
+    finally:
+        conn.close()
+    return changed
+
+
+def load_async(path, asset_id, variant, callback, crop=False):
+    # Pre-sized variants go through the shared image cache, the original is the fallback until it is ingested.
+    # Decoding happens on the images loader thread, returns True if callback already ran.
+    width, height, mode = variants[variant]
+
+    def fallback(result):
+        if result.isNull():
+            images.load_async(path, width, height, mode, crop, callback)
+        else:
+            callback(result)
+
+    if asset_id:
+        return images.load_async(variant_path(asset_id, variant), width, height, mode, crop, fallback)
+    return images.load_async(path, width, height, mode, crop, callback)
+
+
+def placeholder(info, variant):
+    # info is (color, width, height, preview) from the assets table, an empty pixmap when nothing is known yet
+    color, width, height, preview = info if info else (None, None, None, None)
+    if not color:
+        return QPixmap()
+    box = QSize(*variants[variant][:2])
+    size = QSize(width, height).scaled(box, variants[variant][2]).boundedTo(box) if width and height else box
+    if not preview:
+        pixmap = QPixmap(size)
+        pixmap.fill(QColor(color))
+        return pixmap
+    data = bytes.fromhex(preview)
+    image = QImage(data, preview_size, preview_size, preview_size * 3, QImage.Format_RGB888)
+    return QPixmap.fromImage(image.scaled(size, Qt.IgnoreAspectRatio, Qt.SmoothTransformation))
@@ -0,0 +1,66 @@
+import os
+import glob
+import gzip
+import time
+import shutil
+import sqlite3
+
+pages = 256  # Pages copied per step, the source stays readable and writable in between
+
+
+def list_backups(db_path='data.db'):
+    # Timestamps sort lexicographically, oldest first
+    return sorted(glob.glob(f'{glob.escape(db_path)}.*.bak') + glob.glob(f'{glob.escape(db_path)}.*.bak.gz'))
+
+
+def rotate(db_path='data.db', keep=5):
+    # Keeps the newest keep backups, keep=0 removes them all
+    backups = list_backups(db_path)
+    for path in backups[:max(len(backups) - keep, 0)]:
+        os.remove(path)
+
+
+def copy_db(source, target, progress=None):
+    def step(status, remaining, total):
+        if progress is not None:
+            progress(total - remaining, total)
+
+    source.backup(target, pages=pages, progress=step)
+
+
+def backup_db(db_path='data.db', keep=5, compress=False, progress=None):
+    if keep < 1:
+        raise ValueError(f'keep must be at least 1, not {keep}, or the new backup would be removed right away')
+    path = f"{db_path}.{time.strftime('%Y%m%d-%H%M%S')}.bak"
+    source = sqlite3.connect(db_path)
+    target = sqlite3.connect(path)
+    try:
+        copy_db(source, target, progress)
+    finally:
+        target.close()
+        source.close()
+    if compress:
+        with open(path, 'rb') as f_in, gzip.open(path + '.gz', 'wb') as f_out:
+            shutil.copyfileobj(f_in, f_out)
+        os.remove(path)
+        path += '.gz'
+    rotate(db_path, keep)
+    return path
+
+
+def restore_db(backup_path, db_path='data.db', progress=None):
+    path = backup_path
+    if backup_path.endswith('.gz'):
+        path = f'{db_path}.restore'
+        with gzip.open(backup_path, 'rb') as f_in, open(path, 'wb') as f_out:
+            shutil.copyfileobj(f_in, f_out)
+    source = sqlite3.connect(path)
+    target = sqlite3.connect(db_path)
+    try:
+        copy_db(source, target, progress)
+    finally:
+        target.close()
+        source.close()
+        if path != backup_path:
+            os.remove(path)
+    return backup_path
@@ -0,0 +1,229 @@
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import sqlite3
+import argparse
+import platform
+import tempfile
+import subprocess
+
+import catalog
+import exchange
+import backup
+import importdb
+from gendb import gendb
+
+# Times the database side of the launcher on synthetic catalogs of growing size. The operations are the catalog,
+# importdb, exchange and backup functions the GUI runs through its query and worker threads, called directly.
+# Usage: python benchmark.py [--sizes 1000,10000,100000,1000000] [--repeat 200] [--cards 200] [--output results.json]
+
+apps_per_folder = 100
+bulk_rows = 1000
+tree_apps = 1000
+
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, round(p / 100 * (len(ordered) - 1)))]
+
+
+def summarize(samples, rows):
+    # samples are seconds per call, rows is how many rows one call handles. A catalog too small for an operation
+    # reports it with no calls.
+    if not samples:
+        return {'calls': 0, 'rows_per_call': rows}
+    total = sum(samples)
+    return {
+        'calls': len(samples),
+        'rows_per_call': rows,
+        'total_s': round(total, 6),
+        'calls_per_s': round(len(samples) / total, 1) if total else None,
+        'rows_per_s': round(len(samples) * rows / total, 1) if total else None,
+        'p50_ms': round(percentile(samples, 50) * 1000, 3),
+        'p90_ms': round(percentile(samples, 90) * 1000, 3),
+        'p99_ms': round(percentile(samples, 99) * 1000, 3),
+        'max_ms': round(max(samples) * 1000, 3),
+    }
+
+
+def measure(function, repeat, rows=1):
+    # function gets the iteration number, so every call can work on different rows
+    samples = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        function(i)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples, rows)
+
+
+def remove_db(db_path):
+    for path in (db_path, db_path + '-wal', db_path + '-shm'):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def populate(db_path, size):
+    remove_db(db_path)
+    gendb(db_path)
+    conn = catalog.connect(db_path)
+    folders = max(1, size // apps_per_folder)
+    with conn:
+        conn.executemany("insert into folder_cards (folder_id, name, icon_path) values (?, ?, ?)",
+                         [(i + 1, f'Folder {i:07d}', f'/icons/{i}.png') for i in range(folders)])
+        conn.executemany("insert into app_cards (name, background_path, parent_folder_id, command, parameters) "
+                         "values (?, ?, ?, ?, ?)",
+                         ((f'App {i:07d}', f'/backgrounds/{i % 500}.png', i % folders + 1, f'/opt/app{i}/run',
+                           '--fullscreen') for i in range(size)))
+    conn.close()
+    return folders
+
+
+def make_tree(path):
+    # Two directory levels with tree_apps AppImages for importdb
+    for i in range(tree_apps):
+        directory = os.path.join(path, f'group{i % 10}', f'sub{i % 100}')
+        os.makedirs(directory, exist_ok=True)
+        open(os.path.join(directory, f'tool{i}.AppImage'), 'w').close()
+
+
+def run(size, directory, repeat, rng):
+    db_path = os.path.join(directory, f'bench-{size}.db')
+    start = time.perf_counter()
+    folders = populate(db_path, size)
+    results = {'populate': summarize([time.perf_counter() - start], size)}
+    conn = catalog.connect(db_path)
+    app_ids = list(range(1, size + 1))
+    rng.shuffle(app_ids)
+
+    def app_row(i):
+        return f'New app {i}', None, rng.randint(1, folders), f'/opt/new{i}/run', None
+
+    # Reads behind the folder list, opening a folder, searching and the command line
+    results['folder_cards'] = measure(lambda i: catalog.folder_cards(conn), max(1, repeat // 10), folders)
+    results['app_cards'] = measure(lambda i: catalog.app_cards(conn, rng.randint(1, folders)), repeat,
+                                   apps_per_folder)
+    results['search_apps'] = measure(lambda i: catalog.search_apps(conn, f'App {rng.randrange(size):07d}'),
+                                     max(1, repeat // 10))
+    results['find_app'] = measure(lambda i: catalog.find_app(conn, f'Folder {rng.randrange(folders):07d}/App 0'),
+                                  repeat)
+
+    # Writes from the add, modify and remove windows, one row per transaction and in bulk
+    results['add_app'] = measure(lambda i: catalog.add_apps(conn, [app_row(i)]), repeat)
+    results['add_apps_bulk'] = measure(
+        lambda i: catalog.add_apps(conn, [app_row(i * bulk_rows + j) for j in range(bulk_rows)]),
+        max(1, repeat // 20), bulk_rows)
+    results['update_app'] = measure(lambda i: catalog.update_apps(conn, [app_ids[i]], {'name': f'Renamed {i}'}),
+                                    min(repeat, size))
+    results['update_apps_bulk'] = measure(
+        lambda i: catalog.update_apps(conn, app_ids[i * bulk_rows:(i + 1) * bulk_rows], {'nice': 5}),
+        max(1, min(repeat // 20, size // bulk_rows)), min(bulk_rows, size))
+    removable = app_ids[-repeat - bulk_rows * max(1, repeat // 20):]
+    results['remove_app'] = measure(lambda i: catalog.remove_apps(conn, [removable.pop()]), min(repeat, size // 4))
+    rows = min(bulk_rows, len(removable))
+    results['remove_apps_bulk'] = measure(lambda i: catalog.remove_apps(conn, [removable.pop() for _ in range(rows)]),
+                                          max(1, min(repeat // 20, len(removable) // rows)) if rows else 0, rows)
+    results['remove_folder'] = measure(lambda i: catalog.remove_folders(conn, [folders - i]),
+                                       max(1, min(repeat // 10, folders // 2)), apps_per_folder)
+    conn.close()
+
+    # Importing a directory tree into the populated catalog, once new and once again (everything skipped)
+    tree = os.path.join(directory, 'tree')
+    make_tree(tree)
+    results['import_tree'] = measure(lambda i: importdb.import_tree(tree, db_path, depth=2), 1, tree_apps)
+    results['import_tree_again'] = measure(lambda i: importdb.import_tree(tree, db_path, depth=2), 1, tree_apps)
+    shutil.rmtree(tree)
+
+    # Whole catalog operations of the settings window
+    export_path = os.path.join(directory, 'export.jsonl')
+    results['export'] = measure(lambda i: exchange.export_catalog(export_path, db_path), 1, size)
+    merge_path = os.path.join(directory, f'merge-{size}.db')
+    remove_db(merge_path)
+    gendb(merge_path)
+    results['import'] = measure(lambda i: exchange.import_catalog(export_path, merge_path), 1, size)
+    results['import_merge'] = measure(lambda i: exchange.import_catalog(export_path, merge_path, merge=True), 1, size)
+    results['backup'] = measure(lambda i: backup.backup_db(db_path, keep=1), 1, size)
+    for path in backup.list_backups(db_path) + [export_path]:
+        os.remove(path)
+    remove_db(merge_path)
+    return {'apps': size, 'folders': folders, 'file_mb': round(os.path.getsize(db_path) / (1 << 20), 1),
+            'operations': results}
+
+
+def cards(count, repeat, directory):
+    # Builds the folder list and the app grid from catalog rows the way show_folders() and show_apps() do.
+    # Needs PySide6 and a display, QT_QPA_PLATFORM=offscreen works.
+    from PySide6.QtGui import QFont
+    from PySide6.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([])
+    cwd = os.getcwd()
+    os.chdir(directory)  # Importing setting writes a default settings.json when there is none
+    try:
+        from setting import setting
+    finally:
+        os.chdir(cwd)
+    setting.font.setdefault('default', QFont().family())  # main.py fills it from the font files
+    import ui
+
+    folder_rows = [catalog.FolderRow(i, f'Folder {i:07d}', None, None, None, ()) for i in range(count)]
+    app_rows = [catalog.AppRow(i, f'App {i:07d}', None, 1, f'/opt/app{i}/run', '--fullscreen', None, (None,) * 5, ())
+                for i in range(count)]
+    folderList = ui.FolderList()
+    appList = ui.AppList()
+    appList.resize(1600, 1000)
+    results = {
+        'folder_list': measure(lambda i: (folderList.refresh(folder_rows), app.processEvents()), repeat, count),
+        'app_grid': measure(lambda i: (appList.refresh(app_rows), app.processEvents()), repeat, count),
+        'app_grid_relayout': measure(lambda i: (appList.refresh(), app.processEvents()), repeat, count),
+    }
+    return {'cards': count, 'operations': results}
+
+
+def revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='benchmark.py', description='Time the database layer at growing sizes')
+    parser.add_argument('--sizes', default='1000,10000,100000,1000000',
+                        help='comma separated app_cards counts, empty for none')
+    parser.add_argument('--repeat', type=int, default=200, help='calls per latency measurement')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--dir', help='where the synthetic databases go, a temporary directory by default')
+    parser.add_argument('--output', default='-', help='JSON report, - for stdout')
+    parser.add_argument('--cards', type=int, default=0,
+                        help='also time building this many folder and app cards, needs PySide6')
+    args = parser.parse_args(argv)
+
+    directory = args.dir or tempfile.mkdtemp(prefix='yuzu-bench-')
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(args.seed)
+    report = {'revision': revision(), 'python': platform.python_version(), 'sqlite': sqlite3.sqlite_version,
+              'platform': platform.platform(), 'repeat': args.repeat, 'sizes': []}
+    try:
+        for size in [int(size) for size in args.sizes.split(',') if size]:
+            print(f'[benchmark] {size} apps', file=sys.stderr)
+            report['sizes'].append(run(size, directory, args.repeat, rng))
+        if args.cards:
+            print(f'[benchmark] {args.cards} cards', file=sys.stderr)
+            report['views'] = cards(args.cards, max(1, args.repeat // 40), directory)
+    finally:
+        if args.dir is None:
+            shutil.rmtree(directory, ignore_errors=True)
+    text = json.dumps(report, indent=2)
+    if args.output == '-':
+        print(text)
+    else:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+import time
+import sqlite3
+from collections import namedtuple
+
+
+listeners = []  # Called on every connect, e.g. to stop background maintenance
+timing = None  # Set to a Timing by the resource inspector, nothing is recorded while it is None
+
+# Rows of the folder list and the app grid, built on the query thread. The cards keep the row they were made from.
+# image info is (color, width, height, preview) for assets.placeholder(),
+# policy is (cpu_affinity, nice, ioprio, cgroup, working_dir) for launcher.launch().
+FolderRow = namedtuple('FolderRow', 'id title icon_path banner_path icon_asset icon_info')
+AppRow = namedtuple('AppRow', 'id title image_path parent_folder_id command parameters image_asset policy image_info')
+
+
+class Timing:
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+
+    def record(self, start):
+        self.statements += 1
+        self.seconds += time.perf_counter() - start
+
+
+class TimedCursor(sqlite3.Cursor):
+    def execute(self, *args):
+        start = time.perf_counter()
+        try:
+            return super().execute(*args)
+        finally:
+            if timing is not None:
+                timing.record(start)
+
+    def executemany(self, *args):
+        start = time.perf_counter()
+        try:
+            return super().executemany(*args)
+        finally:
+            if timing is not None:
+                timing.record(start)
+
+
+class TimedConnection(sqlite3.Connection):
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, *args):
+        return self.cursor().execute(*args)
+
+    def executemany(self, *args):
+        return self.cursor().executemany(*args)
+
+
+def notify():
+    for listener in listeners:
+        listener()
+
+
+def connect(db_path='data.db'):
+    notify()
+    # Always timed, connections opened before the inspector starts (the query worker's) are counted too
+    conn = sqlite3.connect(db_path, factory=TimedConnection)
+    conn.execute("PRAGMA foreign_keys = ON")  # Removing a folder cascades to its apps
+    return conn
+
+
+def folder_cards(conn, reverse_order=False):
+    cursor = conn.cursor()
+    cursor.execute(f"select folder_id, name, icon_path, banner_path, icon_asset, color, width, height, preview "
+                   f"from folder_cards left join assets on asset_id = icon_asset "
+                   f"order by name {'desc' if reverse_order else ''}")
+    return [FolderRow(*row[:5], row[5:]) for row in cursor]
+
+
+def app_cards(conn, folder_id):
+    cursor = conn.cursor()
+    cursor.execute("select app_id, name, background_path, parent_folder_id, command, parameters, background_asset, "
+                   "cpu_affinity, nice, ioprio, cgroup, working_dir, color, width, height, preview "
+                   "from app_cards left join assets on asset_id = background_asset "
+                   "where parent_folder_id = ? order by app_id", (folder_id,))
+    return [AppRow(*row[:7], row[7:12], row[12:]) for row in cursor]
+
+
+def add_folders(conn, rows):
+    # rows of (name, icon_path, banner_path)
+    with conn:
+        conn.executemany("insert into folder_cards (name, icon_path, banner_path) values (?, ?, ?)", rows)
+
+
+def add_apps(conn, rows):
+    # rows of (name, background_path, parent_folder_id, command, parameters)
+    with conn:
+        conn.executemany("insert into app_cards (name, background_path, parent_folder_id, command, parameters) "
+                         "values (?, ?, ?, ?, ?)", rows)
+
+
+def list_folders(conn):
+    cursor = conn.cursor()
+    cursor.execute("select folder_id, name from folder_cards order by name")
+    return cursor.fetchall()
+
+
+def find_folder(conn, name):
+    cursor = conn.cursor()
+    cursor.execute("select folder_id from folder_cards where name = ?", (name,))
+    folder = cursor.fetchone()
+    return folder[0] if folder else None
+
+
+def list_apps(conn, folder_name=None):
+    cursor = conn.cursor()
+    cursor.execute('''
+        select folder_cards.name, app_cards.name, command, parameters from app_cards
+        join folder_cards on parent_folder_id = folder_id
+        where ? is null or folder_cards.name = ?
+        order by folder_cards.name, app_id
+        ''', (folder_name, folder_name))
+    return cursor.fetchall()
+
+
+def search_apps(conn, keyword):
+    cursor = conn.cursor()
+    cursor.execute('''
+        select folder_cards.name, app_cards.name, command, parameters from app_cards
+        join folder_cards on parent_folder_id = folder_id
+        where app_cards.name like ? or folder_cards.name like ?
+        order by folder_cards.name, app_id
+        ''', (f'%{keyword}%', f'%{keyword}%'))
+    return cursor.fetchall()
+
+
+def find_app(conn, spec):
+    # spec is "<folder>/<app>", folder names may contain '/' so split on the last one
+    folder_name, _, app_name = spec.rpartition('/')
+    cursor = conn.cursor()
+    cursor.execute('''
+        select app_id, command, parameters, cpu_affinity, nice, ioprio, cgroup, working_dir from app_cards
+        join folder_cards on parent_folder_id = folder_id
+        where folder_cards.name = ? and app_cards.name = ?
+        ''', (folder_name, app_name))
+    return cursor.fetchone()
+
+
+def record_launch(conn, app_id):
+    cursor = conn.cursor()
+    cursor.execute('''
+        insert into launch_stats (app_id, launch_count, last_launch) values (?, 1, ?)
+        on conflict (app_id) do update set launch_count = launch_count + 1, last_launch = excluded.last_launch
+        ''', (app_id, time.time()))
+    conn.commit()
+
+
+def most_launched(conn, count):
+    cursor = conn.cursor()
+    cursor.execute('''
+        select command from app_cards
+        join launch_stats using (app_id)
+        where command is not null
+        order by launch_count desc, last_launch desc
+        limit ?
+        ''', (count,))
+    return [row[0] for row in cursor.fetchall()]
+
+
+folder_columns = ('name', 'icon_path', 'banner_path')
+app_columns = ('name', 'background_path', 'parent_folder_id', 'command', 'parameters',
+               'cpu_affinity', 'nice', 'ioprio', 'cgroup', 'working_dir')
+
+
+def update_many(conn, table, key, columns, ids, fields):
+    # fields maps column to new value, every row in ids gets the same values in one transaction
+    assert all(column in columns for column in fields)
+    if not fields or not ids:
+        return
+    assignments = ', '.join(f'{column} = ?' for column in fields)
+    with conn:
+        conn.executemany(f"update {table} set {assignments} where {key} = ?",
+                         [(*fields.values(), id) for id in ids])
+
+
+def update_folders(conn, ids, fields):
+    update_many(conn, 'folder_cards', 'folder_id', folder_columns, ids, fields)
+
+
+def update_apps(conn, ids, fields):
+    update_many(conn, 'app_cards', 'app_id', app_columns, ids, fields)
+
+
+def remove_folders(conn, ids):
+    with conn:
+        conn.executemany("delete from folder_cards where folder_id = ?", [(id,) for id in ids])
+
+
+def remove_apps(conn, ids):
+    with conn:
+        conn.executemany("delete from app_cards where app_id = ?", [(id,) for id in ids])
+
+
+def list_groups(conn):
+    cursor = conn.cursor()
+    cursor.execute("select group_id, name from launch_groups order by name")
+    return cursor.fetchall()
+
+
+def find_group(conn, name):
+    cursor = conn.cursor()
+    cursor.execute("select group_id from launch_groups where name = ?", (name,))
+    group = cursor.fetchone()
+    return group[0] if group else None
+
+
+def add_group(conn, name):
+    with conn:
+        return conn.execute("insert into launch_groups (name) values (?)", (name,)).lastrowid
+
+
+def remove_group(conn, group_id):
+    with conn:
+        conn.execute("delete from launch_groups where group_id = ?", (group_id,))
+
+
+def add_group_member(conn, group_id, app_id, after=(), ready=None, timeout=None):
+    # Adding an app that is already a member replaces its dependencies and probe
+    with conn:
+        conn.execute('''
+            insert or replace into launch_group_members (group_id, app_id, after, ready, timeout)
+            values (?, ?, ?, ?, ?)
+            ''', (group_id, app_id, ' '.join(map(str, after)) or None, ready, timeout))
+
+
+def remove_group_member(conn, group_id, app_id):
+    with conn:
+        conn.execute("delete from launch_group_members where group_id = ? and app_id = ?", (group_id, app_id))
+
+
+def group_members(conn, group_id):
+    cursor = conn.cursor()
+    cursor.execute('''
+        select app_id, folder_cards.name || '/' || app_cards.name, command, parameters, after, ready, timeout,
+               cpu_affinity, nice, ioprio, cgroup, working_dir
+        from launch_group_members
+        join app_cards using (app_id)
+        join folder_cards on parent_folder_id = folder_id
+        where group_id = ?
+        order by app_id
+        ''', (group_id,))
+    return cursor.fetchall()
+
+
+def record_session(conn, summary):
+    # summary is monitor.Session.summary()
+    with conn:
+        conn.execute('''
+            insert into app_sessions (app_id, started, ended, exit_code, cpu_seconds, peak_rss, read_bytes,
+                                      write_bytes, peak_threads, samples)
+            values (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', summary)
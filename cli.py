@@ -0,0 +1,173 @@
+import os
+import sys
+import contextlib
+import argparse
+
+import catalog
+from gendb import gendb
+
+# Every subcommand imports what only it needs, so list and search start without the launcher, importers and groups
+
+
+def load_platform():
+    # Read settings.json directly, setting.py pulls in PySide6
+    if not os.path.exists('settings.json'):
+        return {'enable_sudo': False, 'password': ''}
+    import json  # Only launches read it, json pulls in re
+    with open('settings.json', 'r') as f:
+        return json.load(f).get('platform', {'enable_sudo': False, 'password': ''})
+
+
+def print_apps(apps):
+    from launcher import build_command
+    for folder_name, app_name, command, parameters in apps:
+        print(f"{folder_name}/{app_name}\t{' '.join(build_command(command, parameters))}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='cli.py', description='Yuzu Launcher without the GUI')
+    parser.add_argument('--db', default='data.db')
+    commands = parser.add_subparsers(dest='action', required=True)
+    list_parser = commands.add_parser('list', help='list folders, or the apps of a folder')
+    list_parser.add_argument('folder', nargs='?')
+    search_parser = commands.add_parser('search', help='search apps by name')
+    search_parser.add_argument('keyword')
+    launch_parser = commands.add_parser('launch', help='launch <folder>/<app>')
+    launch_parser.add_argument('app')
+    export_parser = commands.add_parser('export', help='export the catalog as JSON lines, - for stdout')
+    export_parser.add_argument('file')
+    export_parser.add_argument('--assets', action='store_true', help='include icon, banner and background paths')
+    import_parser = commands.add_parser('import', help='import a catalog exported as JSON lines, - for stdin')
+    import_parser.add_argument('file')
+    import_parser.add_argument('--merge', action='store_true', help='reuse folders and skip apps that exist')
+    desktop_parser = commands.add_parser('import-desktop', help='import .desktop entries, one folder per category')
+    desktop_parser.add_argument('directory', nargs='*', help='directories to scan, the XDG application '
+                                                             'directories by default')
+    desktop_parser.add_argument('--theme', help='icon theme to resolve icon names with')
+    tree_parser = commands.add_parser('import-tree', help='import a directory tree, directories become folders')
+    tree_parser.add_argument('directory')
+    tree_parser.add_argument('--depth', type=int, default=1,
+                             help='directory levels that become folders, deeper ones are merged, 0 keeps all')
+    group_parser = commands.add_parser('group', help='manage and launch groups of apps')
+    group_commands = group_parser.add_subparsers(dest='group_action', required=True)
+    group_commands.add_parser('list', help='list groups')
+    for name, help in (('show', 'list the members of a group'), ('create', 'create an empty group'),
+                       ('remove', 'remove a group'), ('launch', 'launch every member of a group')):
+        group_commands.add_parser(name, help=help).add_argument('group')
+    member_parser = group_commands.add_parser('add', help='add <folder>/<app> to a group')
+    member_parser.add_argument('group')
+    member_parser.add_argument('app')
+    member_parser.add_argument('--after', action='append', default=[], metavar='FOLDER/APP',
+                               help='start only once this member is ready, can be repeated')
+    member_parser.add_argument('--ready', help='readiness probe: file:<path>, port:<number> or delay:<seconds>')
+    member_parser.add_argument('--timeout', type=float, help='seconds to wait for the probe')
+    drop_parser = group_commands.add_parser('drop', help='remove <folder>/<app> from a group')
+    drop_parser.add_argument('group')
+    drop_parser.add_argument('app')
+    args = parser.parse_args(argv)
+
+    if args.action == 'import':
+        import exchange
+        gendb(args.db)
+        count = exchange.import_catalog(args.file, args.db, args.merge)
+        print(f'[cli] Imported {count} apps', file=sys.stderr)
+        return 0
+    if args.action == 'import-desktop':
+        import desktop
+        gendb(args.db)
+        desktop.import_entries(args.db, args.directory or None, args.theme)
+        return 0
+    if args.action == 'import-tree':
+        import importdb
+        gendb(args.db)
+        importdb.import_tree(args.directory, args.db, args.depth)
+        return 0
+    if not os.path.exists(args.db):
+        print(f'[cli] {args.db} not found', file=sys.stderr)
+        return 1
+    with contextlib.redirect_stdout(sys.stderr):  # Keeps its messages out of export -
+        gendb(args.db)  # Brings a database of an older version up to the current schema
+    if args.action == 'export':
+        import exchange
+        count = exchange.export_catalog(args.file, args.db, args.assets)
+        print(f'[cli] Exported {count} entries', file=sys.stderr)
+        return 0
+    conn = catalog.connect(args.db)
+    try:
+        if args.action == 'list':
+            if args.folder is None:
+                for _, name in catalog.list_folders(conn):
+                    print(name)
+            else:
+                print_apps(catalog.list_apps(conn, args.folder))
+        elif args.action == 'search':
+            print_apps(catalog.search_apps(conn, args.keyword))
+        elif args.action == 'launch':
+            app = catalog.find_app(conn, args.app)
+            if app is None:
+                print(f'[cli] No such app: {args.app}', file=sys.stderr)
+                return 1
+            app_id, command, parameters, *policy = app
+            from launcher import build_command, launch
+            platform = load_platform()
+            launch(build_command(command, parameters), platform['enable_sudo'], platform['password'], policy)
+            catalog.record_launch(conn, app_id)
+        elif args.action == 'group':
+            return group(conn, args)
+    finally:
+        conn.close()
+    return 0
+
+
+def group(conn, args):
+    if args.group_action == 'list':
+        for _, name in catalog.list_groups(conn):
+            print(name)
+        return 0
+    if args.group_action == 'create':
+        catalog.add_group(conn, args.group)
+        return 0
+    group_id = catalog.find_group(conn, args.group)
+    if group_id is None:
+        print(f'[cli] No such group: {args.group}', file=sys.stderr)
+        return 1
+    if args.group_action == 'remove':
+        catalog.remove_group(conn, group_id)
+    elif args.group_action == 'show':
+        members = catalog.group_members(conn, group_id)
+        names = {row[0]: row[1] for row in members}
+        from launcher import build_command
+        for app_id, name, command, parameters, after, ready, timeout, *policy in members:
+            waits = ', '.join(names.get(int(i), i) for i in (after or '').split())
+            print(f"{name}\t{' '.join(build_command(command, parameters))}\t"
+                  f"after: {waits or '-'}\tready: {ready or 'started'}")
+    elif args.group_action in ('add', 'drop'):
+        apps = []
+        for spec in [args.app] + getattr(args, 'after', []):
+            app = catalog.find_app(conn, spec)
+            if app is None:
+                print(f'[cli] No such app: {spec}', file=sys.stderr)
+                return 1
+            apps.append(app[0])
+        if args.group_action == 'drop':
+            catalog.remove_group_member(conn, group_id, apps[0])
+        else:
+            catalog.add_group_member(conn, group_id, apps[0], apps[1:], args.ready, args.timeout)
+    elif args.group_action == 'launch':
+        from groups import launch_group
+        platform = load_platform()
+        try:
+            results = launch_group(catalog.group_members(conn, group_id), platform['enable_sudo'],
+                                   platform['password'])
+        except ValueError as e:
+            print('[cli]', e, file=sys.stderr)
+            return 1
+        for result in results:
+            if result['started'] is not None:
+                catalog.record_launch(conn, result['app_id'])
+        return 0 if all(result['status'] == 'ready' for result in results) else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+import os
+import shlex
+from concurrent.futures import ThreadPoolExecutor
+
+import catalog
+
+# Main categories of the XDG menu spec and the folder their apps go to, the first one listed wins
+folders = {'AudioVideo': 'Multimedia', 'Audio': 'Multimedia', 'Video': 'Multimedia', 'Development': 'Development',
+           'Education': 'Education', 'Game': 'Games', 'Graphics': 'Graphics', 'Network': 'Internet',
+           'Office': 'Office', 'Science': 'Science', 'Settings': 'Settings', 'System': 'System',
+           'Utility': 'Accessories'}
+other_folder = 'Other'
+field_codes = ('%f', '%F', '%u', '%U', '%d', '%D', '%n', '%N', '%v', '%m', '%i', '%c', '%k')
+icon_extensions = {'.png': 0, '.svg': 1, '.xpm': 2}  # Preferred first
+icon_index = {}  # theme: {icon name: path}, built once per process, see icons()
+
+
+def data_dirs():
+    home = os.environ.get('XDG_DATA_HOME') or os.path.expanduser('~/.local/share')
+    return [home] + (os.environ.get('XDG_DATA_DIRS') or '/usr/local/share:/usr/share').split(':')
+
+
+def application_dirs():
+    return [os.path.join(path, 'applications') for path in data_dirs()
+            if os.path.isdir(os.path.join(path, 'applications'))]
+
+
+def find_entries(roots):
+    # Desktop file id: path below the root with '/' replaced by '-', the first root that has an id wins
+    entries = {}
+    for root in roots:
+        stack = [root]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        if entry.is_dir():
+                            stack.append(entry.path)
+                        elif entry.name.endswith('.desktop'):
+                            entries.setdefault(os.path.relpath(entry.path, root).replace(os.sep, '-'), entry.path)
+            except OSError as e:
+                print('[desktop] Cannot scan:', e)
+    return list(entries.values())
+
+
+def split_exec(text):
+    # Quoting follows the spec closely enough for shlex, field codes are dropped
+    # and parameters are joined with spaces, as build_command() splits them again
+    argv = [arg.replace('%%', '%') for arg in shlex.split(text) if arg not in field_codes]
+    if not argv:
+        raise ValueError('Exec is empty')
+    return argv[0], ' '.join(argv[1:]) or None
+
+
+def parse(path):
+    # (category folder, name, command, parameters, working dir, icon) or None for entries not shown in menus
+    try:
+        with open(path, 'rb') as f:
+            text = f.read().decode('utf-8', 'replace')
+    except OSError:
+        return None
+    keys = {}
+    group = None
+    for line in text.splitlines():
+        if line.startswith('['):
+            if group == '[Desktop Entry]':
+                break
+            group = line.strip()
+        elif group == '[Desktop Entry]' and '=' in line:
+            key, _, value = line.partition('=')
+            keys.setdefault(key.strip(), value.strip())  # Localized keys like Name[de] never match below
+    if keys.get('Type') != 'Application' or 'Exec' not in keys or 'Name' not in keys or \
+            keys.get('NoDisplay') == 'true' or keys.get('Hidden') == 'true':
+        return None
+    try:
+        command, parameters = split_exec(keys['Exec'])
+    except ValueError as e:
+        print(f'[desktop] Skipped {path}:', e)
+        return None
+    categories = keys.get('Categories', '').split(';')
+    folder = next((folders[category] for category in categories if category in folders), other_folder)
+    return folder, keys['Name'], command, parameters, keys.get('Path') or None, keys.get('Icon') or None
+
+
+def icon_size(parts):
+    # 48x48, 48x48@2 or 48 as a directory name, scalable icons count as large
+    for part in parts:
+        if part == 'scalable':
+            return 512
+        size = part.partition('x')[0].partition('@')[0]
+        if size.isdigit():
+            return int(size)
+    return 0
+
+
+def index_theme(path):
+    # icon name: path of the largest icon, PNG before SVG before XPM
+    best = {}
+    stack = [path]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir():
+                        stack.append(entry.path)
+                        continue
+                    name, extension = os.path.splitext(entry.name)
+                    if extension not in icon_extensions:
+                        continue
+                    rank = (icon_extensions[extension], -icon_size(os.path.relpath(entry.path, path).split(os.sep)))
+                    if name not in best or rank < best[name][0]:
+                        best[name] = (rank, entry.path)
+        except OSError:
+            pass
+    return {name: path for name, (rank, path) in best.items()}
+
+
+def inherits(theme):
+    for path in data_dirs():
+        try:
+            with open(os.path.join(path, 'icons', theme, 'index.theme'), 'r') as f:
+                for line in f:
+                    if line.startswith('Inherits='):
+                        return [name.strip() for name in line[len('Inherits='):].split(',') if name.strip()]
+        except OSError:
+            continue
+    return []
+
+
+def icons(theme):
+    # Lookup order of the icon theme spec: the theme, what it inherits, hicolor, then loose pixmaps.
+    # Every theme is walked once and kept, looking an icon up afterwards is a dict access.
+    themes = [theme]
+    for name in themes:
+        themes.extend(parent for parent in inherits(name) if parent not in themes)
+    if 'hicolor' not in themes:
+        themes.append('hicolor')
+    lookup = {}
+    for name in reversed(themes):
+        if name not in icon_index:
+            icon_index[name] = {}
+            for path in [os.path.expanduser('~/.icons')] + [os.path.join(path, 'icons') for path in data_dirs()]:
+                for icon, icon_path in index_theme(os.path.join(path, name)).items():
+                    icon_index[name].setdefault(icon, icon_path)
+        lookup.update(icon_index[name])
+    if '' not in icon_index:
+        icon_index[''] = index_theme('/usr/share/pixmaps')
+    return {**icon_index[''], **lookup}
+
+
+def current_theme():
+    try:
+        with open(os.path.expanduser('~/.config/gtk-3.0/settings.ini'), 'r') as f:
+            for line in f:
+                key, _, value = line.partition('=')
+                if key.strip() == 'gtk-icon-theme-name':
+                    return value.strip()
+    except OSError:
+        pass
+    return 'hicolor'
+
+
+def resolve_icon(icon, lookup):
+    if icon is None:
+        return None
+    if os.path.isabs(icon):
+        return icon if os.path.exists(icon) else None
+    return lookup.get(os.path.splitext(icon)[0] if os.path.splitext(icon)[1] in icon_extensions else icon)
+
+
+def import_entries(db_path='data.db', roots=None, theme=None, cancelled=None, progress=None):
+    # Imports every .desktop entry below roots (the XDG application directories by default) into one folder
+    # per category. Files are parsed in parallel, everything is written in one transaction,
+    # folders with the same name are reused and apps already in their folder are skipped.
+    paths = find_entries(application_dirs() if roots is None else roots)
+    entries = []
+    with ThreadPoolExecutor(min(8, (os.cpu_count() or 1) + 4)) as pool:
+        parsing = pool.map(parse, paths)
+        lookup = icons(theme or current_theme())  # Built while the entries are read
+        for read, entry in enumerate(parsing, 1):
+            if cancelled is not None and cancelled.is_set():
+                pool.shutdown(cancel_futures=True)
+                print('[desktop] Import cancelled')
+                return 0
+            if entry is not None:
+                entries.append(entry)
+            if progress is not None and (read % 50 == 0 or read == len(paths)):
+                progress(read, len(paths))
+
+    imported = 0
+    conn = catalog.connect(db_path)
+    try:
+        with conn:
+            folder_ids = {}
+            for folder, name, command, parameters, working_dir, icon in entries:
+                if folder not in folder_ids:
+                    row = conn.execute("select folder_id from folder_cards where name = ?", (folder,)).fetchone()
+                    folder_ids[folder] = row[0] if row else \
+                        conn.execute("insert into folder_cards (name) values (?)", (folder,)).lastrowid
+                cursor = conn.execute('''
+                    insert into app_cards (name, background_path, parent_folder_id, command, parameters, working_dir)
+                    select ?, ?, ?, ?, ?, ? where not exists (
+                        select 1 from app_cards where parent_folder_id = ? and name = ?
+                    )''', (name, resolve_icon(icon, lookup), folder_ids[folder], command, parameters, working_dir,
+                           folder_ids[folder], name))
+                imported += cursor.rowcount
+    finally:
+        conn.close()
+    print(f'[desktop] Imported {imported} of {len(entries)} entries from {len(paths)} files')
+    return imported
@@ -0,0 +1,122 @@
+import os
+import sys
+import json
+
+import catalog
+import policy
+
+version = 1
+batch_size = 1000
+policy_fields = ('cpu_affinity', 'nice', 'ioprio', 'cgroup', 'working_dir')  # Optional in app records, null is left out
+
+
+def open_stream(path, mode):
+    if path == '-':
+        return sys.stdin if mode == 'r' else sys.stdout
+    return open(path, mode, encoding='utf-8')
+
+
+def export_catalog(path, db_path='data.db', include_assets=False, progress=None):
+    # One JSON object per line: a header, every folder, then every app grouped by folder
+    conn = catalog.connect(db_path)
+    total = conn.execute("select (select count(*) from folder_cards) + (select count(*) from app_cards)").fetchone()[0]
+    done = 0
+    f = open_stream(path, 'w')
+    try:
+        f.write(json.dumps({'type': 'catalog', 'version': version}) + '\n')
+        for folder_id, name, icon_path, banner_path in conn.execute(
+                "select folder_id, name, icon_path, banner_path from folder_cards order by folder_id"):
+            record = {'type': 'folder', 'id': folder_id, 'name': name}
+            if include_assets:
+                record['icon_path'] = icon_path
+                record['banner_path'] = banner_path
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            done += 1
+        for parent_folder_id, name, background_path, command, parameters, *policy in conn.execute(
+                "select parent_folder_id, name, background_path, command, parameters, "
+                f"{', '.join(policy_fields)} from app_cards order by parent_folder_id, app_id"):
+            record = {'type': 'app', 'folder': parent_folder_id, 'name': name,
+                      'command': command, 'parameters': parameters}
+            record.update((field, value) for field, value in zip(policy_fields, policy) if value is not None)
+            if include_assets:
+                record['background_path'] = background_path
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            done += 1
+            if progress is not None and done % batch_size == 0:
+                progress(done, total)
+    finally:
+        if f is not sys.stdout:
+            f.close()
+        conn.close()
+    return done
+
+
+def checked_policy(record):
+    # Values policy.check() rejects are dropped, launch() would fail on them
+    values = []
+    for field in policy_fields:
+        value = record.get(field)
+        if value is not None:
+            try:
+                policy.check(**{field: value})
+            except (ValueError, TypeError) as e:
+                print(f"[exchange] Dropped {field} of {record['name']}:", e)
+                value = None
+        values.append(value)
+    return values
+
+
+def import_catalog(path, db_path='data.db', merge=False, progress=None):
+    # With merge, folders are matched by name and apps already in the target folder are skipped
+    conn = catalog.connect(db_path)
+    cursor = conn.cursor()
+    folders = {}  # Exported folder_id to local folder_id
+    batch = []
+    imported = 0
+    f = open_stream(path, 'r')
+    size = os.fstat(f.fileno()).st_size if f is not sys.stdin else 0
+
+    columns = ', '.join(('name', 'background_path', 'parent_folder_id', 'command', 'parameters') + policy_fields)
+    values = ', '.join('?' * (5 + len(policy_fields)))
+
+    def flush():
+        nonlocal imported
+        with conn:
+            if merge:
+                cursor.executemany(f'''
+                    insert into app_cards ({columns})
+                    select {values} where not exists (
+                        select 1 from app_cards where parent_folder_id = ? and name = ?
+                    )''', [(*row, row[2], row[0]) for row in batch])
+            else:
+                cursor.executemany(f"insert into app_cards ({columns}) values ({values})", batch)
+        imported += max(cursor.rowcount, 0)
+        batch.clear()
+        if progress is not None and size:
+            progress(f.tell() >> 10, size >> 10)
+
+    try:
+        header = json.loads(f.readline())
+        if header.get('type') != 'catalog' or header.get('version', 0) > version:
+            raise ValueError(f'{path} is not a catalog export this launcher understands')
+        for line in iter(f.readline, ''):
+            record = json.loads(line)
+            if record['type'] == 'folder':
+                folder_id = catalog.find_folder(conn, record['name']) if merge else None
+                if folder_id is None:
+                    cursor.execute("insert into folder_cards (name, icon_path, banner_path) values (?, ?, ?)",
+                                   (record['name'], record.get('icon_path'), record.get('banner_path')))
+                    folder_id = cursor.lastrowid
+                folders[record['id']] = folder_id
+            elif record['type'] == 'app':
+                batch.append((record['name'], record.get('background_path'), folders[record['folder']],
+                              record.get('command'), record.get('parameters'),
+                              *checked_policy(record)))
+                if len(batch) >= batch_size:
+                    flush()
+        flush()
+    finally:
+        if f is not sys.stdin:
+            f.close()
+        conn.close()
+    return imported
@@ -1,9 +1,69 @@
 import sqlite3
 
+app_cards_schema = '''
+    CREATE TABLE IF NOT EXISTS {} (
+        app_id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        background_path TEXT,
+        parent_folder_id INTEGER,
+        command TEXT,
+        parameters TEXT,
+        FOREIGN KEY (parent_folder_id) REFERENCES folder_cards (folder_id) ON DELETE CASCADE
+    )
+    '''
+
+
+def migrate_cascade(conn):
+    # Databases created before ON DELETE CASCADE keep apps of removed folders, drop them and rebuild the table
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA foreign_key_list(app_cards)")
+    if all(row[6] == 'CASCADE' for row in cursor.fetchall() if row[2] == 'folder_cards'):
+        return
+    cursor.execute("DELETE FROM app_cards WHERE parent_folder_id IS NULL "
+                   "OR parent_folder_id NOT IN (SELECT folder_id FROM folder_cards)")
+    print(f'[gendb] Removed {cursor.rowcount} orphaned apps')
+    cursor.execute(app_cards_schema.format('app_cards_new'))
+    columns = 'app_id, name, background_path, parent_folder_id, command, parameters'
+    cursor.execute(f"INSERT INTO app_cards_new ({columns}) SELECT {columns} FROM app_cards")
+    cursor.execute("DROP TABLE app_cards")
+    cursor.execute("ALTER TABLE app_cards_new RENAME TO app_cards")
+
 
-def gendb():
-    conn = sqlite3.connect('data.db')
+def add_column(conn, table, column, declaration):
     cursor = conn.cursor()
+    cursor.execute(f"PRAGMA table_info({table})")
+    if column not in [row[1] for row in cursor.fetchall()]:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+
+
+def reset_on_update(conn, table, key, path_column, asset_column):
+    # A new path invalidates the ingested asset, assets.sync() picks the row up again
+    conn.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS {table}_{asset_column}_reset AFTER UPDATE OF {path_column} ON {table}
+    WHEN new.{path_column} IS NOT old.{path_column}
+    BEGIN
+        UPDATE {table} SET {asset_column} = NULL WHERE {key} = new.{key};
+    END
+    ''')
+
+
+def gendb(db_path='data.db', journal_mode=None):
+    # journal_mode 'wal' or 'delete' converts the database, the mode is stored in the file and kept until changed.
+    # None leaves an existing database as it is and gives a new one WAL. WAL needs shared memory between every
+    # process that opens the file, which network file systems do not provide, so data.db on a share needs 'delete'.
+    if journal_mode not in (None, 'wal', 'delete'):
+        raise ValueError(f"journal_mode must be 'wal' or 'delete', not {journal_mode!r}")
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    new = cursor.execute("PRAGMA page_count").fetchone()[0] == 0
+
+    # auto_vacuum only takes effect on a new database, older ones are converted by maintenance.py
+    cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    if journal_mode is not None or new:
+        try:
+            cursor.execute(f"PRAGMA journal_mode = {journal_mode or 'wal'}")
+        except sqlite3.OperationalError as e:  # Another process has the database open, tried again next start
+            print('[gendb] Cannot change the journal mode:', e)
 
     cursor.execute('''
     CREATE TABLE IF NOT EXISTS folder_cards (
@@ -14,18 +74,94 @@ def gendb():
     )
     ''')
 
+    cursor.execute(app_cards_schema.format('app_cards'))
+    migrate_cascade(conn)
+
     cursor.execute('''
-    CREATE TABLE IF NOT EXISTS app_cards (
+    CREATE TABLE IF NOT EXISTS launch_stats (
         app_id INTEGER PRIMARY KEY,
-        name TEXT NOT NULL,
-        background_path TEXT,
-        parent_folder_id INTEGER,
-        command TEXT,
-        parameters TEXT,
-        FOREIGN KEY (parent_folder_id) REFERENCES folder_cards (folder_id)
+        launch_count INTEGER NOT NULL DEFAULT 0,
+        last_launch REAL,
+        FOREIGN KEY (app_id) REFERENCES app_cards (app_id) ON DELETE CASCADE
+    )
+    ''')
+    cursor.execute("DELETE FROM launch_stats WHERE app_id NOT IN (SELECT app_id FROM app_cards)")
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS assets (
+        asset_id TEXT PRIMARY KEY
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS asset_sources (
+        path TEXT PRIMARY KEY,
+        size INTEGER,
+        mtime REAL,
+        asset_id TEXT,
+        FOREIGN KEY (asset_id) REFERENCES assets (asset_id)
     )
     ''')
 
+    # Placeholder data, see assets.describe()
+    add_column(conn, 'assets', 'color', 'TEXT')
+    add_column(conn, 'assets', 'width', 'INTEGER')
+    add_column(conn, 'assets', 'height', 'INTEGER')
+    add_column(conn, 'assets', 'preview', 'TEXT')
+    add_column(conn, 'folder_cards', 'icon_asset', 'TEXT REFERENCES assets (asset_id)')
+    add_column(conn, 'folder_cards', 'banner_asset', 'TEXT REFERENCES assets (asset_id)')
+    add_column(conn, 'app_cards', 'background_asset', 'TEXT REFERENCES assets (asset_id)')
+    # Launch policy, see policy.py
+    add_column(conn, 'app_cards', 'cpu_affinity', 'TEXT')
+    add_column(conn, 'app_cards', 'nice', 'INTEGER')
+    add_column(conn, 'app_cards', 'ioprio', 'TEXT')
+    add_column(conn, 'app_cards', 'cgroup', 'TEXT')
+    add_column(conn, 'app_cards', 'working_dir', 'TEXT')
+    reset_on_update(conn, 'folder_cards', 'folder_id', 'icon_path', 'icon_asset')
+    reset_on_update(conn, 'folder_cards', 'folder_id', 'banner_path', 'banner_asset')
+    reset_on_update(conn, 'app_cards', 'app_id', 'background_path', 'background_asset')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS launch_groups (
+        group_id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE
+    )
+    ''')
+
+    # after lists the app_ids of the group this member waits for, ready is a probe (see groups.py)
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS launch_group_members (
+        group_id INTEGER NOT NULL,
+        app_id INTEGER NOT NULL,
+        after TEXT,
+        ready TEXT,
+        timeout REAL,
+        PRIMARY KEY (group_id, app_id),
+        FOREIGN KEY (group_id) REFERENCES launch_groups (group_id) ON DELETE CASCADE,
+        FOREIGN KEY (app_id) REFERENCES app_cards (app_id) ON DELETE CASCADE
+    )
+    ''')
+
+    # One row per finished launch, written by monitor.py
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS app_sessions (
+        session_id INTEGER PRIMARY KEY,
+        app_id INTEGER NOT NULL,
+        started REAL,
+        ended REAL,
+        exit_code INTEGER,
+        cpu_seconds REAL,
+        peak_rss INTEGER,
+        read_bytes INTEGER,
+        write_bytes INTEGER,
+        peak_threads INTEGER,
+        samples INTEGER,
+        FOREIGN KEY (app_id) REFERENCES app_cards (app_id) ON DELETE CASCADE
+    )
+    ''')
+
+    cursor.execute("CREATE INDEX IF NOT EXISTS app_cards_parent ON app_cards (parent_folder_id, name)")
+
     conn.commit()
     conn.close()
 
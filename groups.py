@@ -0,0 +1,113 @@
+import os
+import time
+import socket
+import threading
+
+from launcher import build_command, launch
+
+poll_interval = 0.05
+default_timeout = 30
+
+
+def check(probe):
+    # file:<path> waits for the file to appear, port:<number> for something listening on localhost
+    kind, _, value = probe.partition(':')
+    if kind == 'file':
+        return os.path.exists(os.path.expanduser(value))
+    if kind == 'port':
+        try:
+            socket.create_connection(('127.0.0.1', int(value)), timeout=poll_interval).close()
+            return True
+        except OSError:
+            return False
+    raise ValueError(f'Unknown readiness probe: {probe}')
+
+
+def wait_ready(process, probe, timeout):
+    # Without a probe a member is ready as soon as its process started
+    if probe is None:
+        return True
+    kind, _, value = probe.partition(':')
+    if kind == 'delay':
+        time.sleep(float(value))
+        return process.poll() in (None, 0)
+    deadline = time.monotonic() + timeout
+    while not check(probe):
+        # Exiting with 0 is fine, helpers often fork into the background
+        if process.poll() not in (None, 0) or time.monotonic() >= deadline:
+            return False
+        time.sleep(poll_interval)
+    return True
+
+
+def dependencies(members):
+    # members are rows of catalog.group_members, returns app_id: [app_ids it waits for]
+    after = {row[0]: [int(i) for i in (row[4] or '').split()] for row in members}
+    for app_id, waits in after.items():
+        for dependency in waits:
+            if dependency not in after:
+                raise ValueError(f'App {app_id} waits for app {dependency}, which is not in the group')
+    remaining = dict(after)
+    while remaining:
+        free = [app_id for app_id, waits in remaining.items() if not any(i in remaining for i in waits)]
+        if not free:
+            raise ValueError(f'Launch group has a dependency cycle between apps {sorted(remaining)}')
+        for app_id in free:
+            del remaining[app_id]
+    return after
+
+
+def launch_group(members, enable_sudo=False, password='', progress=None):
+    # Every member gets a thread: independent ones start at once, the others as soon as
+    # everything they wait for is ready. Times are milliseconds since the group started.
+    after = dependencies(members)
+    rows = {row[0]: row for row in members}
+    ready = {app_id: threading.Event() for app_id in rows}
+    results = {}
+    lock = threading.Lock()
+    start = time.perf_counter()
+
+    def elapsed():
+        return round((time.perf_counter() - start) * 1000, 1)
+
+    def run(app_id):
+        _, name, command, parameters, _, probe, timeout, *policy = rows[app_id]
+        result = {'app_id': app_id, 'name': name, 'status': 'skipped', 'waited': None, 'started': None,
+                  'ready': None, 'process': None}
+        try:
+            for dependency in after[app_id]:
+                ready[dependency].wait()
+                if results[dependency]['status'] != 'ready':
+                    return
+            result['waited'] = elapsed()
+            process = result['process'] = launch(build_command(command, parameters), enable_sudo, password,
+                                                policy)
+            result['started'] = elapsed()
+            if wait_ready(process, probe, timeout or default_timeout):
+                result['status'] = 'ready'
+                result['ready'] = elapsed()
+            else:
+                result['status'] = 'failed'
+        except (OSError, ValueError) as e:
+            print(f'[launch_group] {name} failed:', e)
+            result['status'] = 'failed'
+        finally:
+            with lock:
+                results[app_id] = result
+                if progress is not None:
+                    progress(len(results), len(rows))
+            ready[app_id].set()
+
+    threads = [threading.Thread(target=run, args=(app_id,), name=f'launch-{app_id}') for app_id in rows]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for app_id in rows:
+        result = results[app_id]
+        times = ', '.join(f'{key} {result[key]}ms' for key in ('waited', 'started', 'ready')
+                          if result[key] is not None)
+        print(f"[launch_group] {result['name']}: {result['status']}{', ' if times else ''}{times}")
+    print(f'[launch_group] Total {elapsed()}ms')
+    return [results[app_id] for app_id in rows]
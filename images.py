@@ -0,0 +1,151 @@
+import queue
+from collections import OrderedDict
+
+from PySide6.QtCore import Qt, QRect, QThread, Signal, QCoreApplication
+from PySide6.QtGui import QImage, QImageReader, QPixmap
+
+# Decoded pixmaps keyed by (path, width, height, mode, crop), least recently used first
+cache = OrderedDict()
+cache_bytes = 0
+peak_bytes = 0
+budget = 128 << 20
+hits = 0
+misses = 0
+
+
+def pixmap_bytes(pixmap):
+    return pixmap.width() * pixmap.height() * pixmap.depth() // 8
+
+
+def trim(limit=None):
+    global cache_bytes
+    limit = budget if limit is None else limit
+    while cache and cache_bytes > limit:
+        _, pixmap = cache.popitem(last=False)
+        cache_bytes -= pixmap_bytes(pixmap)
+
+
+def set_budget(limit):
+    global budget
+    budget = limit
+    trim()
+
+
+def decode(path, width, height, mode, crop):
+    # Decodes straight to the target size, with crop the top-left width x height of the scaled image is kept
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    size = reader.size()
+    if size.isValid():
+        scaled = size.scaled(width, height, mode)
+        reader.setScaledSize(scaled)
+        if crop:
+            reader.setScaledClipRect(QRect(0, 0, min(width, scaled.width()), min(height, scaled.height())))
+    return reader.read()
+
+
+def insert(key, image):
+    global cache_bytes, peak_bytes
+    if image.isNull():
+        return QPixmap()
+    pixmap = QPixmap.fromImage(image)
+    cache[key] = pixmap
+    cache_bytes += pixmap_bytes(pixmap)
+    peak_bytes = max(peak_bytes, cache_bytes)
+    trim()
+    return pixmap
+
+
+def cached(key):
+    global hits
+    pixmap = cache.get(key)
+    if pixmap is not None:
+        cache.move_to_end(key)
+        hits += 1
+    return pixmap
+
+
+def load(path, width, height, mode=Qt.KeepAspectRatio, crop=False):
+    global misses
+    if not path:
+        return QPixmap()
+    key = (path, width, height, mode, crop)
+    pixmap = cached(key)
+    if pixmap is not None:
+        return pixmap
+    misses += 1
+    return insert(key, decode(*key))
+
+
+class Loader(QThread):
+    # Decodes QImages off the GUI thread, the QPixmap conversion and the callbacks run back on it
+    loaded = Signal(object, QImage)
+
+    def __init__(self):
+        super().__init__()
+        self.requests = queue.Queue()
+        self.pending = {}  # key: callbacks waiting for it
+        self.loaded.connect(self.deliver)
+
+    def request(self, key, callback):
+        global misses
+        if key in self.pending:
+            self.pending[key].append(callback)
+            return
+        misses += 1
+        self.pending[key] = [callback]
+        self.requests.put(key)
+
+    def run(self):
+        while True:
+            key = self.requests.get()
+            if key is None:
+                break
+            self.loaded.emit(key, decode(*key))
+
+    def deliver(self, key, image):
+        pixmap = insert(key, image)
+        for callback in self.pending.pop(key, []):
+            try:
+                callback(pixmap)
+            except RuntimeError:
+                pass  # The card was deleted before its image arrived
+
+    def stop(self):
+        self.requests.put(None)
+        self.wait()
+
+
+loader = None
+
+
+def load_async(path, width, height, mode=Qt.KeepAspectRatio, crop=False, callback=None):
+    # Cached images reach callback right away and True is returned, the others are decoded by the loader
+    global loader
+    key = (path, width, height, mode, crop)
+    pixmap = cached(key) if path else QPixmap()
+    if pixmap is not None:
+        callback(pixmap)
+        return True
+    if loader is None:
+        loader = Loader()
+        QCoreApplication.instance().aboutToQuit.connect(loader.stop)
+        loader.start()
+    loader.request(key, callback)
+    return False
+
+
+def stats():
+    return {
+        'images': len(cache),
+        'bytes': cache_bytes,
+        'peak_bytes': peak_bytes,
+        'budget': budget,
+        'hits': hits,
+        'misses': misses
+    }
+
+
+def report():
+    print(f"[images] {len(cache)} images, {cache_bytes >> 20} MiB now, {peak_bytes >> 20} MiB peak, "
+          f"budget {budget >> 20} MiB, {hits} hits, {misses} misses")
@@ -1,41 +1,156 @@
 import os
-import sqlite3
-import win32com.client
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
+import catalog
+import desktop
 
-def get_shortcut_target(file):
-    shell = win32com.client.Dispatch("WScript.Shell")
-    shortcut = shell.CreateShortCut(file)
-    return shortcut.Targetpath
+if sys.platform == 'win32':
+    import pythoncom
+    import win32com.client
+else:
+    pythoncom = win32com = None
 
+batch_size = 500
+workers = 8
+local = threading.local()
+
+
+def init_thread():
+    # Shortcuts are read through COM, which every pool thread has to initialize for itself
+    if pythoncom is not None:
+        pythoncom.CoInitialize()
+
+
+def read_shortcut(path):
+    if win32com is None:
+        return None
+    if not hasattr(local, 'shell'):
+        local.shell = win32com.client.Dispatch("WScript.Shell")
+    shortcut = local.shell.CreateShortCut(path)
+    return (os.path.splitext(os.path.basename(path))[0], shortcut.Targetpath, shortcut.Arguments or None,
+            shortcut.WorkingDirectory or None, None)
+
+
+def read_desktop_entry(path):
+    entry = desktop.parse(path)
+    return entry[1:] if entry is not None else None
+
+
+def read_executable(path):
+    return os.path.splitext(os.path.basename(path))[0], path, None, None, None
 
-def insert_folder(conn, name):
-    cursor = conn.cursor()
-    cursor.execute("INSERT INTO folder_cards (name) VALUES (?)", (name,))
-    return cursor.lastrowid
 
+# Files that become apps, each reader returns (name, command, parameters, working dir, icon) or None
+readers = {'.lnk': read_shortcut, '.desktop': read_desktop_entry, '.appimage': read_executable}
 
-def insert_app_card(conn, name, command, parent_folder_id):
+
+def folder_name(root, path, depth):
+    # The first depth levels below root become folders, deeper directories are merged into their ancestor.
+    # depth 0 keeps every directory as its own folder, apps directly in root go to a folder named after it.
+    parts = os.path.relpath(path, root).split(os.sep) if path != root else []
+    if not parts:
+        return os.path.basename(os.path.normpath(root))
+    return '/'.join(parts[:depth] if depth else parts)
+
+
+def scan_directory(root, path, depth):
+    directories = []
+    entries = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.name.startswith('.'):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    directories.append(entry.path)
+                    continue
+                reader = readers.get(os.path.splitext(entry.name)[1].lower())
+                if reader is None:
+                    continue
+                try:
+                    app = reader(entry.path)
+                except Exception as e:
+                    print(f'[import] Cannot read {entry.path}:', e)
+                    continue
+                if app is not None:
+                    entries.append((folder_name(root, path, depth), *app))
+    except OSError as e:
+        print('[import] Cannot scan:', e)
+    return directories, entries
+
+
+def scan(root, depth=1, cancelled=None, progress=None):
+    # Walks root on a thread pool and yields the entries of each directory as soon as it is read,
+    # every directory found is queued right away so the pool stays busy on deep and wide trees alike
+    with ThreadPoolExecutor(workers, initializer=init_thread) as pool:
+        pending = {pool.submit(scan_directory, root, root, depth)}
+        found = 1
+        scanned = 0
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            if cancelled is not None and cancelled.is_set():
+                pool.shutdown(cancel_futures=True)
+                return
+            for future in done:
+                directories, entries = future.result()
+                scanned += 1
+                found += len(directories)
+                pending.update(pool.submit(scan_directory, root, path, depth) for path in directories)
+                if entries:
+                    yield entries
+            if progress is not None:
+                progress(scanned, found)
+
+
+def import_tree(root, db_path='data.db', depth=1, cancelled=None, progress=None):
+    # Apps stream into the database in batches of batch_size while the walk goes on. Folders with the same name
+    # are reused and apps already in their folder with the same name and command are skipped, so a cancelled
+    # import can simply be rerun. Merged directories may hold apps of the same name, both are kept.
+    root = os.path.abspath(root)  # '.' or a trailing separator would otherwise name the root folder '' or '.'
+    if not os.path.isdir(root):
+        raise ValueError(f'{root} is not a directory')
+    conn = catalog.connect(db_path)
     cursor = conn.cursor()
-    cursor.execute(
-        "INSERT INTO app_cards (name, command, parent_folder_id) VALUES (?, ?, ?)",
-        (name[:-4], command, parent_folder_id))
-    return cursor.lastrowid
+    folders = {}  # Folder name to folder_id
+    batch = []
+    imported = 0
+
+    def flush():
+        nonlocal imported
+        with conn:
+            for name in {row[0] for row in batch} - folders.keys():
+                folder_id = catalog.find_folder(conn, name)
+                if folder_id is None:
+                    cursor.execute("insert into folder_cards (name) values (?)", (name,))
+                    folder_id = cursor.lastrowid
+                folders[name] = folder_id
+            cursor.executemany('''
+                insert into app_cards (name, background_path, parent_folder_id, command, parameters, working_dir)
+                select ?, ?, ?, ?, ?, ? where not exists (
+                    select 1 from app_cards where parent_folder_id = ? and name = ? and command is ?
+                )''', [(name, icon, folders[folder], command, parameters, working_dir, folders[folder], name, command)
+                       for folder, name, command, parameters, working_dir, icon in batch])
+        imported += max(cursor.rowcount, 0)
+        batch.clear()
+
+    try:
+        for entries in scan(root, depth, cancelled, progress):
+            batch.extend(entries)
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+    finally:
+        conn.close()
+    print(f"[import] Imported {imported} apps from {root}{' (cancelled)' if cancelled and cancelled.is_set() else ''}")
+    return imported
 
 
 def process_folders_and_shortcuts(root_folder, db_path='data.db'):
-    conn = sqlite3.connect(db_path)
-    for folder_name in os.listdir(root_folder):
-        folder_path = os.path.join(root_folder, folder_name)
-        if os.path.isdir(folder_path):
-            folder_id = insert_folder(conn, folder_name)
-            for file in os.listdir(folder_path):
-                file_path = os.path.join(folder_path, file)
-                if file_path.endswith(".lnk"):  # Assuming shortcut files end with .lnk
-                    target_path = get_shortcut_target(file_path)
-                    insert_app_card(conn, file, target_path, folder_id)
-    conn.commit()
-    conn.close()
+    # The old two level layout, root/<folder>/<shortcut>
+    return import_tree(root_folder, db_path, depth=1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,108 @@
+import json
+import time
+
+from PySide6.QtWidgets import QApplication, QLabel
+from PySide6.QtGui import QFont, QKeySequence, QShortcut
+from PySide6.QtCore import Qt, QObject, QEvent, QTimer
+
+from ui import QMarqueeLabel
+import catalog
+import images
+import launcher
+
+
+class PaintCounter(QObject):
+    def __init__(self):
+        super().__init__()
+        self.count = 0
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Paint:
+            self.count += 1
+        return False
+
+
+class Inspector(QLabel):
+    # F12 toggles the overlay, Ctrl+F12 dumps a snapshot to JSON. While hidden nothing is hooked or polled.
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.setFont(QFont("Monospace", 10))
+        self.setStyleSheet("color: white; background-color: rgba(0, 0, 0, 0.7); padding: 8px;")
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.move(10, 50)
+        self.hide()
+
+        self.paints = PaintCounter()
+        self.last = None
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+
+        QShortcut(QKeySequence("F12"), parent, self.toggle)
+        QShortcut(QKeySequence("Ctrl+F12"), parent, self.dump)
+
+    def toggle(self):
+        if self.isVisible():
+            self.timer.stop()
+            QApplication.instance().removeEventFilter(self.paints)
+            catalog.timing = None
+            self.hide()
+        else:
+            catalog.timing = catalog.Timing()
+            self.paints.count = 0
+            QApplication.instance().installEventFilter(self.paints)
+            self.last = None
+            self.refresh()
+            self.show()
+            self.raise_()
+            self.timer.start(1000)
+
+    def snapshot(self):
+        widgets = QApplication.allWidgets()
+        pixmaps = {}
+        for widget in widgets:
+            if isinstance(widget, QLabel) and not widget.pixmap().isNull():
+                pixmap = widget.pixmap()
+                pixmaps[pixmap.cacheKey()] = images.pixmap_bytes(pixmap)
+        data = {
+            'widgets': len(widgets),
+            'marquee_timers': sum(1 for widget in widgets
+                                  if isinstance(widget, QMarqueeLabel) and widget.timer.isActive()),
+            'image_cache': images.stats(),
+            'decoded_image_bytes': sum(pixmaps.values()),
+            'children': len(launcher.running())
+        }
+        if catalog.timing is not None:
+            now = time.perf_counter()
+            counters = (now, catalog.timing.statements, catalog.timing.seconds, self.paints.count)
+            if self.last is not None:
+                elapsed = now - self.last[0]
+                data['sql_per_second'] = (counters[1] - self.last[1]) / elapsed
+                data['sql_ms_per_second'] = (counters[2] - self.last[2]) * 1000 / elapsed
+                data['paints_per_second'] = (counters[3] - self.last[3]) / elapsed
+            self.last = counters
+        return data
+
+    def refresh(self):
+        data = self.snapshot()
+        cache = data['image_cache']
+        lines = [
+            f"widgets          {data['widgets']}",
+            f"marquee timers   {data['marquee_timers']}",
+            f"image cache      {cache['bytes'] >> 10} KiB / {cache['budget'] >> 20} MiB, {cache['images']} images",
+            f"image peak       {cache['peak_bytes'] >> 10} KiB",
+            f"decoded pixmaps  {data['decoded_image_bytes'] >> 10} KiB",
+            f"children         {data['children']}"
+        ]
+        if 'sql_per_second' in data:
+            lines += [
+                f"sql/s            {data['sql_per_second']:.1f} ({data['sql_ms_per_second']:.1f} ms/s)",
+                f"paints/s         {data['paints_per_second']:.1f}"
+            ]
+        self.setText('\n'.join(lines))
+        self.adjustSize()
+
+    def dump(self):
+        path = f"inspector-{time.strftime('%Y%m%d-%H%M%S')}.json"
+        with open(path, 'w') as f:
+            json.dump(self.snapshot(), f, indent=4)
+        print('[inspector] Saved', path)
@@ -0,0 +1,47 @@
+import os
+import hashlib
+
+from PySide6.QtCore import Signal
+from PySide6.QtNetwork import QLocalServer, QLocalSocket
+
+
+def server_name():
+    # One instance per catalog, so launchers working on different data.db files do not collide
+    digest = hashlib.md5(os.path.abspath('data.db').encode()).hexdigest()[:8]
+    return f'YuzuLauncher-{digest}'
+
+
+def forward(request, timeout=100):
+    socket = QLocalSocket()
+    socket.connectToServer(server_name())
+    if not socket.waitForConnected(timeout):
+        return False
+    socket.write((request + '\n').encode())
+    socket.waitForBytesWritten(timeout)
+    socket.disconnectFromServer()
+    return True
+
+
+class InstanceServer(QLocalServer):
+    received = Signal(str)
+
+    def __init__(self):
+        super().__init__()
+        self.newConnection.connect(self._accept)
+
+    def start(self):
+        QLocalServer.removeServer(server_name())  # Clean up a stale socket left by a crashed instance
+        return self.listen(server_name())
+
+    def _accept(self):
+        while self.hasPendingConnections():
+            socket = self.nextPendingConnection()
+            socket.readyRead.connect(lambda s=socket: self._read(s))
+            socket.disconnected.connect(socket.deleteLater)
+            self._read(socket)
+
+    def _read(self, socket):
+        while socket.canReadLine():
+            request = bytes(socket.readLine()).decode().strip()
+            if request:
+                self.received.emit(request)
@@ -0,0 +1,56 @@
+import os
+import threading
+import subprocess
+
+from policy import preexec
+
+sudo = ['sudo', '-S']
+children = []  # Processes started by launch()
+listeners = []  # Called with (process, returncode) from the reaper thread when a child exits
+launch_listeners = []  # Called with the process right after launch() started it
+
+
+def running():
+    children[:] = [p for p in children if p.poll() is None]
+    return children
+
+
+def build_command(command, parameters):
+    # command is a single executable, parameters are split on whitespace
+    return [command if command else ''] + (parameters.split() if parameters else [])
+
+
+def reap(p):
+    returncode = p.wait()
+    print(f'[run_command] Exited with {returncode}:', p.args)
+    for listener in listeners:
+        listener(p, returncode)
+
+
+def launch(command, enable_sudo=False, password='', policy=()):
+    # policy is (cpu_affinity, nice, ioprio, cgroup, working_dir) as stored in app_cards,
+    # the working directory goes to Popen, the rest is applied in the child before exec
+    preexec_fn = preexec(*policy)
+    cwd = os.path.expanduser(policy[4]) if len(policy) > 4 and policy[4] else None
+    if enable_sudo:
+        print('[run_command] Run:', sudo + command)
+        p = subprocess.Popen(sudo + command, text=True, stdin=subprocess.PIPE, preexec_fn=preexec_fn,
+                             cwd=cwd)
+        # Hand the password over and close stdin, the child keeps running on its own
+        try:
+            p.stdin.write(password + '\n')
+        except BrokenPipeError:
+            pass  # sudo had cached credentials and did not read it
+        finally:
+            try:
+                p.stdin.close()  # Flushes what is left, the pipe is closed even when that fails
+            except BrokenPipeError:
+                pass
+    else:
+        print('[run_command] Run:', command)
+        p = subprocess.Popen(command, preexec_fn=preexec_fn, cwd=cwd)
+    children.append(p)
+    for listener in launch_listeners:
+        listener(p)
+    threading.Thread(target=reap, args=(p,), name=f'reap-{p.pid}', daemon=True).start()
+    return p
@@ -1,20 +1,55 @@
 import sys
 import os
+import atexit
 
-from PySide6.QtGui import QFontDatabase, QFont
-
-from window import app, window
-from slots import refresh_folders
-from gendb import gendb
-from setting import setting
+from instance import forward
 
 if __name__ == "__main__":
-    if not os.path.exists("data.db"):
-        gendb()
+    # Usage: main.py [show | open <folder> | launch <folder>/<app> | group <group>]
+    request = ' '.join(sys.argv[1:]) or 'show'
+    if forward(request):
+        sys.exit(0)
+
+    from PySide6.QtGui import QFontDatabase, QFont
+
+    from window import app, window
+    from slots import refresh_folders, handle_request, sync_assets
+    from gendb import gendb
+    from setting import setting
+    from instance import InstanceServer
+    from scheduler import MaintenanceScheduler
+    from inspector import Inspector
+    from watchdog import StallWatchdog
+    from powersave import PowerSaver
+    import prewarm
+    import images
+
+    images.set_budget(setting.image_budget_mb << 20)
+    atexit.register(images.report)
+    gendb(journal_mode=setting.journal_mode)  # Also brings older databases up to the current schema
     for key, value in setting.fontPath.items():
         fontId = QFontDatabase.addApplicationFont(os.path.abspath(value))
         fontFamilies = QFontDatabase.applicationFontFamilies(fontId)
         setting.font[key] = fontFamilies[0]
     window.titleLabel.setFont(QFont(setting.font['default'], 16))
     refresh_folders()
+    sync_assets(full=True)
+    if setting.prewarm['enabled']:
+        prewarm.start(apps=setting.prewarm['apps'], budget=setting.prewarm['budget_mb'] << 20)
+
+    if setting.maintenance['enabled']:
+        scheduler = MaintenanceScheduler(app, setting.maintenance['idle_seconds'],
+                                         setting.maintenance['interval_hours'])
+
+    inspector = Inspector(window)
+
+    server = InstanceServer()
+    server.received.connect(handle_request)
+    server.start()
+    if request != 'show':
+        handle_request(request)
+    if setting.power_save['enabled']:
+        power_saver = PowerSaver(window, setting.power_save['image_budget_mb'], setting.power_save['nice'])
+    if setting.watchdog['enabled']:
+        watchdog = StallWatchdog(setting.watchdog['threshold_ms'])
     sys.exit(app.exec())
@@ -0,0 +1,78 @@
+import os
+import time
+import sqlite3
+
+steps = ['optimize', 'vacuum', 'checkpoint', 'quick_check']
+
+
+def file_size(db_path):
+    return sum(os.path.getsize(path) for path in (db_path, db_path + '-wal') if os.path.exists(path))
+
+
+class Maintenance:
+    # Runs the maintenance steps on its own connection, stop() may be called from any thread
+    def __init__(self, db_path='data.db', pending=None):
+        self.db_path = db_path
+        self.pending = list(steps if pending is None else pending)
+        self.conn = None
+        self.stopped = False
+
+    def stop(self):
+        self.stopped = True
+        if self.conn is not None:
+            self.conn.interrupt()
+
+    def optimize(self):
+        cursor = self.conn.cursor()
+        cursor.execute("select count(*) from sqlite_master where name = 'sqlite_stat1'")
+        if cursor.fetchone()[0] == 0:
+            cursor.execute("ANALYZE")
+        cursor.execute("PRAGMA optimize")
+
+    def vacuum(self):
+        cursor = self.conn.cursor()
+        cursor.execute("PRAGMA auto_vacuum")
+        if cursor.fetchone()[0] != 2:
+            # Databases created before incremental auto vacuum need one full VACUUM to switch over
+            cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            cursor.execute("VACUUM")
+        else:
+            cursor.execute("PRAGMA incremental_vacuum").fetchall()
+
+    def checkpoint(self):
+        self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+
+    def quick_check(self):
+        result = self.conn.execute("PRAGMA quick_check").fetchall()
+        if result != [('ok',)]:
+            print('[maintenance] quick_check reported:', result)
+
+    def run(self, progress=None):
+        before = file_size(self.db_path)
+        start = time.perf_counter()
+        self.conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+        try:
+            while self.pending and not self.stopped:
+                step = self.pending[0]
+                step_start = time.perf_counter()
+                try:
+                    getattr(self, step)()
+                except sqlite3.OperationalError as e:
+                    # Interrupted, or the GUI is holding a lock, try again on the next idle period
+                    print(f'[maintenance] {step} stopped: {e}')
+                    break
+                self.pending.pop(0)
+                print(f'[maintenance] {step} took {(time.perf_counter() - step_start) * 1000:.0f}ms')
+                if progress is not None:
+                    progress(len(steps) - len(self.pending), len(steps))
+        finally:
+            self.conn.close()
+            self.conn = None
+        reclaimed = before - file_size(self.db_path)
+        print(f'[maintenance] {time.perf_counter() - start:.2f}s spent, {reclaimed} bytes reclaimed, '
+              f'{len(self.pending)} steps left')
+        return self.pending
+
+
+if __name__ == "__main__":
+    Maintenance().run()
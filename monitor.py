@@ -0,0 +1,171 @@
+import os
+import time
+
+from PySide6.QtCore import QObject, QEvent, QTimer, Signal
+
+import launcher
+
+available = os.path.isdir('/proc')
+clock_ticks = os.sysconf('SC_CLK_TCK') if available else 100
+page_size = os.sysconf('SC_PAGE_SIZE') if available else 4096
+
+
+class ProcReader:
+    # Keeps /proc/<pid>/stat and io open and re-reads them into one preallocated buffer,
+    # a sample costs a pread per file instead of an open, a read and a close.
+    def __init__(self):
+        self.buffer = bytearray(4096)
+        self.fds = {}  # (pid, name): fd, None when the file cannot be opened (io of a root process)
+
+    def read(self, pid, name):
+        key = (pid, name)
+        if key not in self.fds:
+            try:
+                self.fds[key] = os.open(f'/proc/{pid}/{name}', os.O_RDONLY)
+            except OSError:
+                self.fds[key] = None
+        fd = self.fds[key]
+        if fd is None:
+            return 0
+        try:
+            return os.preadv(fd, [self.buffer], 0)
+        except OSError:
+            return 0
+
+    def stat(self, pid):
+        # (cpu ticks, rss bytes, threads), or None once the process is gone
+        length = self.read(pid, 'stat')
+        if not length:
+            return None
+        # The command name may contain spaces, the fields after it are fixed
+        fields = self.buffer[self.buffer.rfind(b')', 0, length) + 2:length].split()
+        return int(fields[11]) + int(fields[12]), int(fields[21]) * page_size, int(fields[17])
+
+    def io(self, pid):
+        length = self.read(pid, 'io')
+        return self.field(b'read_bytes: ', length), self.field(b'write_bytes: ', length)
+
+    def field(self, name, length):
+        start = self.buffer.find(name, 0, length)
+        if start < 0:
+            return 0
+        start += len(name)
+        return int(self.buffer[start:self.buffer.find(b'\n', start, length)])
+
+    def children(self, pid):
+        length = self.read(pid, f'task/{pid}/children')
+        return [int(child) for child in self.buffer[:length].split()]
+
+    def forget(self, pids):
+        for key in [key for key in self.fds if key[0] not in pids]:
+            if self.fds[key] is not None:
+                os.close(self.fds[key])
+            del self.fds[key]
+
+
+class Session:
+    def __init__(self, app_id, process):
+        self.app_id = app_id
+        self.process = process
+        self.started = time.time()
+        self.ticks = {}  # pid: cpu ticks at the last sample, exited children keep their last value
+        self.last = None  # (monotonic time, total ticks)
+        self.cpu_percent = 0.0
+        self.rss = 0
+        self.threads = 0
+        self.read_bytes = 0
+        self.write_bytes = 0
+        self.peak_rss = 0
+        self.peak_threads = 0
+        self.samples = 0
+
+    def summary(self, returncode):
+        return (self.app_id, self.started, time.time(), returncode, sum(self.ticks.values()) / clock_ticks,
+                self.peak_rss, self.read_bytes, self.write_bytes, self.peak_threads, self.samples)
+
+
+class Monitor(QObject):
+    # Samples every tracked process tree while the window is visible, nothing runs while it is hidden
+    sampled = Signal(int, str)  # app_id, figures for the card
+    finished = Signal(object)  # Session.summary() rows for catalog.record_session
+    exited = Signal(object, int)
+
+    def __init__(self, window, interval_ms=2000):
+        super().__init__()
+        self.window = window
+        self.reader = ProcReader()
+        self.sessions = {}  # pid of the launched process: Session
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self.sample)
+        self.exited.connect(self.finish)
+        launcher.listeners.append(self.exited.emit)  # Called from the reaper thread
+        window.installEventFilter(self)
+
+    def track(self, process, app_id):
+        if not available or process.poll() is not None:
+            return
+        self.sessions[process.pid] = Session(app_id, process)
+        self.resume()
+
+    def resume(self):
+        if self.sessions and self.window.isVisible() and not self.window.isMinimized():
+            if not self.timer.isActive():
+                self.timer.start()
+                self.sample()
+        else:
+            self.timer.stop()
+
+    def eventFilter(self, watched, event):
+        if event.type() in (QEvent.Show, QEvent.Hide, QEvent.WindowStateChange):
+            self.resume()
+        return False
+
+    def tree(self, pid):
+        pids = [pid]
+        for parent in pids:
+            pids.extend(self.reader.children(parent))
+        return pids
+
+    def sample(self):
+        now = time.monotonic()
+        alive = set()
+        for pid, session in self.sessions.items():
+            rss = threads = read_bytes = write_bytes = 0
+            for child in self.tree(pid):
+                stat = self.reader.stat(child)
+                if stat is None:
+                    continue
+                alive.add(child)
+                session.ticks[child] = stat[0]
+                rss += stat[1]
+                threads += stat[2]
+                io = self.reader.io(child)
+                read_bytes += io[0]
+                write_bytes += io[1]
+            ticks = sum(session.ticks.values())
+            if session.last is not None and now > session.last[0]:
+                session.cpu_percent = (ticks - session.last[1]) / clock_ticks / (now - session.last[0]) * 100
+            session.last = (now, ticks)
+            session.rss = rss
+            session.threads = threads
+            # Children that exit take their I/O counters with them, keep the highest total seen
+            session.read_bytes = max(session.read_bytes, read_bytes)
+            session.write_bytes = max(session.write_bytes, write_bytes)
+            session.peak_rss = max(session.peak_rss, rss)
+            session.peak_threads = max(session.peak_threads, threads)
+            session.samples += 1
+            self.sampled.emit(session.app_id, f'CPU {session.cpu_percent:.0f}%  RAM {rss >> 20} MiB  '
+                                              f'{threads} threads')
+        self.reader.forget(alive)
+        for session in list(self.sessions.values()):
+            if session.process.returncode is not None:
+                self.finish(session.process, session.process.returncode)  # Exited before it was tracked
+
+    def finish(self, process, returncode):
+        session = self.sessions.pop(process.pid, None)
+        if session is None:
+            return
+        self.sampled.emit(session.app_id, '')
+        self.finished.emit(session.summary(returncode))
+        self.resume()
@@ -0,0 +1,92 @@
+import os
+import sys
+import ctypes
+
+ioprio_syscall = {'x86_64': 251, 'i686': 289, 'aarch64': 30, 'armv7l': 314}
+ioprio_classes = {'realtime': 1, 'best-effort': 2, 'idle': 3}
+# Loaded before any fork, the child of a threaded parent must not go through the dynamic loader
+libc = ctypes.CDLL(None, use_errno=True) if sys.platform == 'linux' else None
+
+
+def ioprio_set(ioprio_class, level=0, thread_id=0):
+    # IOPRIO_WHO_PROCESS, 0 is the calling thread
+    number = ioprio_syscall.get(os.uname().machine)
+    if libc is None or number is None:
+        raise OSError('ioprio_set is not available on this platform')
+    if libc.syscall(number, 1, thread_id, ioprio_class << 13 | level) != 0:
+        raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+
+
+def parse_cpus(text):
+    # "0-3,6" as in taskset -c
+    cpus = set()
+    for part in text.split(','):
+        first, _, last = part.strip().partition('-')
+        cpus.update(range(int(first), int(last or first) + 1))
+    return cpus
+
+
+def parse_ioprio(text):
+    # "idle", "best-effort:4" or "realtime:0", levels go from 0 (highest) to 7
+    name, _, level = text.partition(':')
+    if name not in ioprio_classes:
+        raise ValueError(f"Unknown I/O priority class '{name}', use one of {', '.join(ioprio_classes)}")
+    level = int(level or 4)
+    if not 0 <= level <= 7:
+        raise ValueError('I/O priority level must be between 0 and 7')
+    return ioprio_classes[name], level
+
+
+def cgroup_procs(path):
+    return os.path.join(path if os.path.isabs(path) else os.path.join('/sys/fs/cgroup', path), 'cgroup.procs')
+
+
+def join_cgroup(procs):
+    with open(procs, 'w') as f:
+        f.write('0')  # 0 is the writing process
+
+
+def check(cpu_affinity=None, nice=None, ioprio=None, cgroup=None, working_dir=None):
+    # Raises ValueError for values preexec() could not apply, so they are caught while editing
+    if cpu_affinity:
+        if not parse_cpus(cpu_affinity):
+            raise ValueError('CPU affinity is empty')
+    if nice is not None and not -20 <= int(nice) <= 19:
+        raise ValueError('Nice must be between -20 and 19')
+    if ioprio:
+        parse_ioprio(ioprio)
+    if cgroup and not os.path.exists(cgroup_procs(cgroup)):
+        raise ValueError(f'{cgroup_procs(cgroup)} does not exist')
+    if working_dir and not os.path.isdir(os.path.expanduser(working_dir)):
+        raise ValueError(f'{working_dir} is not a directory')
+
+
+def preexec(cpu_affinity=None, nice=None, ioprio=None, cgroup=None, working_dir=None):
+    # Returns a preexec_fn for subprocess.Popen that applies the policy in the child before exec,
+    # or None when there is nothing to apply. Everything is parsed here, in the parent.
+    # working_dir is accepted so a whole app_cards policy can be passed, launch() hands it to Popen.
+    if sys.platform != 'linux' or not (cpu_affinity or nice is not None or ioprio or cgroup):
+        return None
+    cpus = parse_cpus(cpu_affinity) if cpu_affinity else None
+    priority = parse_ioprio(ioprio) if ioprio else None
+    procs = cgroup_procs(cgroup) if cgroup else None
+
+    steps = []
+    if procs is not None:
+        steps.append(lambda: join_cgroup(procs))
+    if cpus is not None:
+        steps.append(lambda: os.sched_setaffinity(0, cpus))
+    if nice is not None:
+        steps.append(lambda: os.setpriority(os.PRIO_PROCESS, 0, int(nice)))
+    if priority is not None:
+        steps.append(lambda: ioprio_set(*priority))
+
+    def apply():
+        # A step that fails is reported on stderr, the others still apply and the app starts anyway
+        for step in steps:
+            try:
+                step()
+            except OSError as e:
+                os.write(2, f'[run_command] Cannot apply launch policy: {e}\n'.encode())
+
+    return apply
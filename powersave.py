@@ -0,0 +1,121 @@
+import os
+import time
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from PySide6.QtCore import Qt, QObject, QEvent, Signal
+from PySide6.QtGui import QGuiApplication
+
+from ui import QMarqueeLabel
+import launcher
+import images
+
+return_events = (QEvent.WindowActivate, QEvent.Enter, QEvent.MouseButtonPress, QEvent.KeyPress)
+renice = hasattr(os, 'setpriority')  # Unix only, elsewhere the priority is left alone
+
+
+def resident_bytes():
+    try:
+        with open('/proc/self/statm', 'rb') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        return 0
+
+
+def can_restore(nice):
+    # Lowering the nice value again needs CAP_SYS_NICE (root) or an RLIMIT_NICE that reaches down to it,
+    # a normal user can only raise it for good
+    if os.geteuid() == 0:
+        return True
+    if resource is None or not hasattr(resource, 'RLIMIT_NICE'):
+        return False
+    limit = resource.getrlimit(resource.RLIMIT_NICE)[0]
+    return limit == resource.RLIM_INFINITY or 20 - limit <= nice
+
+
+def set_nice(nice):
+    # On Linux setpriority() only changes the calling thread, so every thread of the launcher is set
+    tasks = os.listdir('/proc/self/task') if os.path.isdir('/proc/self/task') else [0]
+    for task in tasks:
+        os.setpriority(os.PRIO_PROCESS, int(task), nice)
+
+
+class PowerSaver(QObject):
+    # Goes quiet while an app launched from here runs or the window is in the background:
+    # no marquee animation, a small image cache and a lower priority. The user coming back restores it.
+    launched = Signal()
+
+    def __init__(self, window, image_budget_mb=8, nice=10):
+        super().__init__()
+        self.window = window
+        self.image_budget = image_budget_mb << 20
+        self.nice = nice
+        self.active = False
+        self.pressed = False  # Entered while a mouse press was being delivered, see eventFilter()
+        self.normal_budget = images.budget
+        self.normal_nice = os.getpriority(os.PRIO_PROCESS, 0) if renice else 0
+        self.renice = renice and can_restore(self.normal_nice)
+        if renice and not self.renice:
+            print('[powersave] Priority is left alone, RLIMIT_NICE does not allow restoring it')
+        self.since = (time.monotonic(), time.process_time())
+
+        self.launched.connect(self.enter)
+        launcher.launch_listeners.append(lambda process: self.launched.emit())  # May come from a worker thread
+        window.installEventFilter(self)
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.WindowStateChange and self.window.isMinimized():
+            self.enter()
+        elif event.type() == QEvent.WindowDeactivate:
+            self.enter()
+        elif event.type() == QEvent.MouseButtonPress and self.pressed:
+            # The press on a card that launched an app reaches the window only after enter(), it is not a return
+            self.pressed = False
+        elif event.type() in return_events and self.active:
+            self.leave()
+        return False
+
+    def report(self, mode):
+        # Idle CPU and RSS of the mode that just ended, printed on every switch
+        now = (time.monotonic(), time.process_time())
+        wall = now[0] - self.since[0]
+        if wall > 0:
+            print(f'[powersave] {mode} for {wall:.1f}s: CPU {(now[1] - self.since[1]) / wall * 100:.2f}%, '
+                  f'RSS {resident_bytes() >> 20} MiB')
+        self.since = now
+
+    def enter(self):
+        if self.active:
+            return
+        self.report('normal')
+        self.active = True
+        self.pressed = QGuiApplication.mouseButtons() != Qt.NoButton
+        QMarqueeLabel.animate = False
+        for label in self.window.findChildren(QMarqueeLabel):
+            label.timer.stop()
+        self.normal_budget = images.budget
+        images.set_budget(min(self.image_budget, self.normal_budget))
+        if not self.renice:
+            return
+        try:
+            set_nice(max(self.nice, self.normal_nice))
+        except OSError as e:
+            print('[powersave] Cannot lower priority:', e)
+
+    def leave(self):
+        self.report('low power')
+        self.active = False
+        self.pressed = False
+        try:
+            if self.renice:
+                set_nice(self.normal_nice)
+        except OSError as e:
+            print('[powersave] Cannot restore priority:', e)
+        # Images are decoded again as cards ask for them, marquees restart when hovered or scrolled
+        images.set_budget(self.normal_budget)
+        QMarqueeLabel.animate = True
+        for label in self.window.findChildren(QMarqueeLabel):
+            if label.always_scroll:
+                label.timer.start(40)
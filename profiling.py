@@ -0,0 +1,66 @@
+import os
+import time
+import atexit
+import cProfile
+import functools
+
+# '' disabled, 'timing' counts calls with wall and CPU time, 'cprofile' also saves a cProfile capture per call
+mode = ''
+records = {}  # name: [calls, wall seconds, cpu seconds, slowest wall seconds]
+captures = 0
+depth = 0
+report_path = 'profile_report.txt'
+capture_dir = 'profiles'
+
+
+def configure(new_mode):
+    global mode
+    if new_mode and not mode:
+        atexit.register(report)
+    mode = new_mode
+
+
+def profiled(name, function):
+    # Functions are returned untouched when profiling is off, so there is no cost at all
+    if not mode:
+        return function
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        global captures, depth
+        profile = None
+        if mode == 'cprofile' and depth == 0:  # Nested calls are part of the outer capture
+            profile = cProfile.Profile()
+            profile.enable()
+        depth += 1
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.process_time() - cpu
+            depth -= 1
+            record = records.setdefault(name, [0, 0.0, 0.0, 0.0])
+            record[0] += 1
+            record[1] += wall
+            record[2] += cpu
+            record[3] = max(record[3], wall)
+            if profile is not None:
+                profile.disable()
+                os.makedirs(capture_dir, exist_ok=True)
+                captures += 1
+                profile.dump_stats(os.path.join(capture_dir, f'{captures:05d}-{name}.prof'))
+
+    return wrapper
+
+
+def report():
+    lines = [f"{'name':<32}{'calls':>8}{'wall ms':>12}{'mean ms':>12}{'max ms':>12}{'cpu ms':>12}"]
+    for name, (calls, wall, cpu, slowest) in sorted(records.items(), key=lambda item: -item[1][1]):
+        lines.append(f"{name:<32}{calls:>8}{wall * 1000:>12.1f}{wall * 1000 / calls:>12.2f}"
+                     f"{slowest * 1000:>12.1f}{cpu * 1000:>12.1f}")
+    with open(report_path, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+    print(f'[profiling] Report saved to {report_path}' +
+          (f', {captures} captures in {capture_dir}/' if captures else ''))
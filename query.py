@@ -0,0 +1,88 @@
+import queue
+import itertools
+import threading
+
+from PySide6.QtCore import QThread, Signal
+
+import catalog
+
+
+class QueryWorker(QThread):
+    # Owns its own connection and runs function(conn, *args) jobs in order off the GUI thread.
+    # Jobs sharing a key supersede each other: queued older ones are skipped and late results dropped.
+    result = Signal(int, object)
+    error = Signal(int, str)
+
+    def __init__(self, db_path='data.db'):
+        super().__init__()
+        self.db_path = db_path
+        self.requests = queue.Queue()
+        self.ids = itertools.count(1)
+        self.latest = {}  # key: id of the newest request with that key
+        self.callbacks = {}  # id: (key, callback, failed)
+        self.result.connect(self.deliver)
+        self.error.connect(self.deliver_error)
+
+    def submit(self, function, *args, key=None, callback=None, failed=None):
+        id = next(self.ids)
+        if key is not None:
+            self.callbacks.pop(self.latest.get(key), None)
+            self.latest[key] = id
+        self.callbacks[id] = (key, callback, failed)
+        self.requests.put((id, key, function, args))
+        return id
+
+    def current(self, id, key):
+        return key is None or self.latest.get(key) == id
+
+    def run(self):
+        conn = None  # Opened on the first request, after gendb() has set the database up
+        while True:
+            request = self.requests.get()
+            if request is None:
+                break
+            if isinstance(request, threading.Event):
+                if conn is not None:
+                    conn.close()
+                    conn = None
+                request.set()
+                continue
+            id, key, function, args = request
+            if not self.current(id, key):
+                continue
+            if conn is None:
+                conn = catalog.connect(self.db_path)
+            else:
+                catalog.notify()
+            try:
+                result = function(conn, *args)
+            except Exception as e:
+                conn.rollback()
+                self.error.emit(id, str(e))
+                continue
+            self.result.emit(id, result)
+        if conn is not None:
+            conn.close()
+
+    def deliver(self, id, result):
+        key, callback, _ = self.callbacks.pop(id, (None, None, None))
+        if callback is not None and self.current(id, key):
+            callback(result)
+
+    def deliver_error(self, id, message):
+        _, _, failed = self.callbacks.pop(id, (None, None, None))
+        if failed is not None:
+            failed(message)
+        else:
+            print('[query] Failed:', message)
+
+    def release(self):
+        # Closes the connection once the requests before have run and returns then, so the database file can be
+        # removed or replaced. The next request opens it again.
+        released = threading.Event()
+        self.requests.put(released)
+        released.wait()
+
+    def stop(self):
+        self.requests.put(None)
+        self.wait()
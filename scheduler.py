@@ -0,0 +1,60 @@
+import time
+
+from PySide6.QtCore import QObject, QEvent, QTimer
+
+from worker import Worker
+from maintenance import Maintenance
+import catalog
+
+input_events = (QEvent.MouseButtonPress, QEvent.MouseMove, QEvent.KeyPress, QEvent.Wheel)
+
+
+class MaintenanceScheduler(QObject):
+    # Starts database maintenance once the launcher has been idle for a while and stops it on any activity
+    def __init__(self, app, idle_seconds=60, interval_hours=24):
+        super().__init__()
+        self.idle_seconds = idle_seconds
+        self.interval = interval_hours * 3600
+        self.last_activity = time.monotonic()
+        self.last_finished = None
+        self.maintenance = None
+        self.worker = None
+
+        app.installEventFilter(self)
+        catalog.listeners.append(self.activity)
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.check)
+        self.timer.start(5000)
+
+    def eventFilter(self, watched, event):
+        if event.type() in input_events:
+            self.activity()
+        return False
+
+    def activity(self):
+        self.last_activity = time.monotonic()
+        if self.maintenance is not None:
+            self.maintenance.stop()
+
+    def check(self):
+        now = time.monotonic()
+        if self.worker is not None and self.worker.isRunning() or now - self.last_activity < self.idle_seconds:
+            return
+        if self.last_finished is not None and now - self.last_finished < self.interval:
+            return
+        pending = self.maintenance.pending if self.maintenance is not None else None
+        self.maintenance = Maintenance(pending=pending)
+        self.worker = Worker(self.maintenance.run)
+        self.worker.done.connect(self.done)
+        self.worker.failed.connect(self.failed)
+        self.worker.start()
+
+    def done(self, pending):
+        if not pending:
+            self.maintenance = None
+            self.last_finished = time.monotonic()
+
+    def failed(self, message):
+        print('[maintenance] Failed:', message)
+        self.maintenance = None
+        self.last_finished = time.monotonic()
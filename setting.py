@@ -1,9 +1,13 @@
-import os, shutil, json
+import os, json
 
 from PySide6.QtWidgets import (QWidget, QHBoxLayout, QGridLayout, QVBoxLayout, QLabel, QPushButton,
-                               QLineEdit, QMessageBox)
+                               QLineEdit, QMessageBox, QCheckBox, QFileDialog, QProgressDialog)
 
 from gendb import gendb
+from worker import Worker
+import backup
+import exchange
+import images
 
 
 class Setting:
@@ -24,6 +28,36 @@ class Setting:
         self.background = "default_background.png"
         self.background_mask = "background-color: rgba(0, 0, 0, 0.8);"
         self.mode = 'dark'
+        self.prewarm = {
+            'enabled': False,
+            'apps': 5,
+            'budget_mb': 256
+        }
+        self.backup = {
+            'keep': 5,
+            'compress': False
+        }
+        self.maintenance = {
+            'enabled': True,
+            'idle_seconds': 60,
+            'interval_hours': 24
+        }
+        self.image_budget_mb = 128
+        self.profile = ''
+        self.journal_mode = 'wal'  # 'delete' for a data.db on a network share, see gendb()
+        self.watchdog = {
+            'enabled': False,
+            'threshold_ms': 100
+        }
+        self.monitor = {
+            'enabled': False,
+            'interval_ms': 2000
+        }
+        self.power_save = {
+            'enabled': True,
+            'image_budget_mb': 8,
+            'nice': 10
+        }
         self.load_from_file()
 
     def create_default_file(self):
@@ -33,7 +67,16 @@ class Setting:
             'platform': self.platform,
             'background': self.background,
             'background_mask': self.background_mask,
-            'mode': self.mode
+            'mode': self.mode,
+            'prewarm': self.prewarm,
+            'backup': self.backup,
+            'maintenance': self.maintenance,
+            'image_budget_mb': self.image_budget_mb,
+            'profile': self.profile,
+            'journal_mode': self.journal_mode,
+            'watchdog': self.watchdog,
+            'monitor': self.monitor,
+            'power_save': self.power_save
         }
         with open('settings.json', 'w') as f:
             json.dump(default_data, f, indent=4)
@@ -45,7 +88,16 @@ class Setting:
             'platform': self.platform,
             'background': self.background,
             'background_mask': self.background_mask,
-            'mode': self.mode
+            'mode': self.mode,
+            'prewarm': self.prewarm,
+            'backup': self.backup,
+            'maintenance': self.maintenance,
+            'image_budget_mb': self.image_budget_mb,
+            'profile': self.profile,
+            'journal_mode': self.journal_mode,
+            'watchdog': self.watchdog,
+            'monitor': self.monitor,
+            'power_save': self.power_save
         }
         with open('settings.json', 'w') as f:
             json.dump(data, f, indent=4)
@@ -69,6 +121,36 @@ class Setting:
         self.background = data.get('background', "default_background.png")
         self.background_mask = data.get('background_mask', "background-color: rgba(0, 0, 0, 0.8);")
         self.mode = data.get('mode', 'dark')
+        self.prewarm = data.get('prewarm', {
+            'enabled': False,
+            'apps': 5,
+            'budget_mb': 256
+        })
+        self.backup = data.get('backup', {
+            'keep': 5,
+            'compress': False
+        })
+        self.maintenance = data.get('maintenance', {
+            'enabled': True,
+            'idle_seconds': 60,
+            'interval_hours': 24
+        })
+        self.image_budget_mb = data.get('image_budget_mb', 128)
+        self.profile = data.get('profile', '')
+        self.journal_mode = data.get('journal_mode', 'wal')
+        self.watchdog = data.get('watchdog', {
+            'enabled': False,
+            'threshold_ms': 100
+        })
+        self.monitor = data.get('monitor', {
+            'enabled': False,
+            'interval_ms': 2000
+        })
+        self.power_save = data.get('power_save', {
+            'enabled': True,
+            'image_budget_mb': 8,
+            'nice': 10
+        })
 
 
 setting = Setting()
@@ -108,11 +190,70 @@ class SettingMenu(QWidget):
         self.appearance.addWidget(self.title5, 2, 2)
         self.appearance.addWidget(self.background_mask, 2, 3)
 
+        self.performance = QGridLayout()
+        self.title6 = QLabel("Performance")
+        self.prewarm = QCheckBox("Prewarm most launched apps")
+        self.prewarm.setChecked(setting.prewarm['enabled'])
+        self.prewarm.setToolTip("Reads the files of the most launched apps into the page cache after startup, so their "
+                                "next start does not wait for the disk.\nThe gain is measured by python prewarm.py, "
+                                "which times reading those files cold and warm, not the apps starting.")
+        self.title7 = QLabel("Apps:")
+        self.prewarm_apps = QLineEdit()
+        self.prewarm_apps.setText(str(setting.prewarm['apps']))
+        self.title8 = QLabel("Budget (MB):")
+        self.prewarm_budget = QLineEdit()
+        self.prewarm_budget.setText(str(setting.prewarm['budget_mb']))
+        self.performance.addWidget(self.title6, 0, 0)
+        self.performance.addWidget(self.prewarm, 1, 0)
+        self.performance.addWidget(self.title7, 1, 1)
+        self.performance.addWidget(self.prewarm_apps, 1, 2)
+        self.performance.addWidget(self.title8, 1, 3)
+        self.performance.addWidget(self.prewarm_budget, 1, 4)
+        self.maintenance = QCheckBox("Database maintenance when idle")
+        self.maintenance.setChecked(setting.maintenance['enabled'])
+        self.performance.addWidget(self.maintenance, 2, 0)
+        self.title10 = QLabel("Image Memory (MB):")
+        self.image_budget = QLineEdit()
+        self.image_budget.setText(str(setting.image_budget_mb))
+        self.performance.addWidget(self.title10, 2, 1)
+        self.performance.addWidget(self.image_budget, 2, 2)
+        self.watchdog = QCheckBox("Log GUI stalls to stall.log")
+        self.watchdog.setChecked(setting.watchdog['enabled'])
+        self.performance.addWidget(self.watchdog, 3, 0)
+        self.monitor = QCheckBox("Monitor launched apps")
+        self.monitor.setChecked(setting.monitor['enabled'])
+        self.title11 = QLabel("Sample Every (ms):")
+        self.monitor_interval = QLineEdit()
+        self.monitor_interval.setText(str(setting.monitor['interval_ms']))
+        self.performance.addWidget(self.monitor, 4, 0)
+        self.performance.addWidget(self.title11, 4, 1)
+        self.performance.addWidget(self.monitor_interval, 4, 2)
+        self.power_save = QCheckBox("Low-power mode in the background")
+        self.power_save.setChecked(setting.power_save['enabled'])
+        self.performance.addWidget(self.power_save, 5, 0)
+
         self.database = QHBoxLayout()
         self.backup = QPushButton("Backup")
+        self.restore = QPushButton("Restore")
+        self.export = QPushButton("Export")
+        self.import_ = QPushButton("Import")
         self.clear_all = QPushButton("Clear All")
+        self.title9 = QLabel("Keep:")
+        self.backup_keep = QLineEdit()
+        self.backup_keep.setText(str(setting.backup['keep']))
+        self.backup_keep.setFixedWidth(50)
+        self.backup_compress = QCheckBox("Compress")
+        self.backup_compress.setChecked(setting.backup['compress'])
         self.database.addWidget(self.backup)
+        self.database.addWidget(self.restore)
+        self.database.addWidget(self.title9)
+        self.database.addWidget(self.backup_keep)
+        self.database.addWidget(self.backup_compress)
+        self.database.addWidget(self.export)
+        self.database.addWidget(self.import_)
         self.database.addWidget(self.clear_all)
+        self.worker = None
+        self.progressDialog = None
 
         self.end = QHBoxLayout()
         self.cancel = QPushButton("Cancel")
@@ -122,22 +263,104 @@ class SettingMenu(QWidget):
         self.end.addWidget(self.save)
 
         self.backup.clicked.connect(self.backup_db)
+        self.restore.clicked.connect(self.restore_db)
+        self.export.clicked.connect(self.export_db)
+        self.import_.clicked.connect(self.import_db)
         self.clear_all.clicked.connect(self.clear_db)
         self.cancel.clicked.connect(self.exit)
         self.save.clicked.connect(self.saveData)
 
         self.layout.addLayout(self.appearance)
         self.layout.addSpacing(30)
+        self.layout.addLayout(self.performance)
+        self.layout.addSpacing(30)
         self.layout.addWidget(QLabel("Database"))
         self.layout.addLayout(self.database)
         self.layout.addLayout(self.end)
 
+    def run_worker(self, label, function, *args, **kwargs):
+        # Runs a long database task on a worker thread with a progress dialog
+        self.progressDialog = QProgressDialog(label, None, 0, 0, self)
+        self.progressDialog.setMinimumDuration(0)
+        self.worker = Worker(function, *args, **kwargs)
+        self.worker.progress.connect(self.update_progress)
+        self.worker.failed.connect(self.worker_failed)
+        self.worker.finished.connect(self.progressDialog.close)
+        self.worker.start()
+        return self.worker
+
+    def update_progress(self, done, total):
+        self.progressDialog.setMaximum(total)
+        self.progressDialog.setValue(done)
+
+    def worker_failed(self, message):
+        QMessageBox.warning(self, "Error", message)
+
+    def backup_keep_value(self):
+        # The number of backups to keep, None after a warning when it is not a whole number of at least 1
+        text = self.backup_keep.text().strip()
+        if not text.isdigit() or int(text) < 1:
+            QMessageBox.warning(self, "Error", f"Backups to keep must be a whole number of at least 1, not '{text}'")
+            return None
+        return int(text)
+
     def backup_db(self):
-        try:
-            shutil.copyfile("data.db", "data.db.bak")
-            QMessageBox.information(self, '', "Backup finished, filename is data.db.bak")
-        except Exception as e:
-            QMessageBox.warning(self, "Error", str(e))
+        keep = self.backup_keep_value()
+        if keep is None:
+            return
+        worker = self.run_worker("Backing up...", backup.backup_db,
+                                 keep=keep, compress=self.backup_compress.isChecked())
+        worker.done.connect(lambda path: QMessageBox.information(self, '', f"Backup finished, filename is {path}"))
+
+    def restore_db(self):
+        backups = backup.list_backups()
+        path, _ = QFileDialog.getOpenFileName(self, "Restore", backups[-1] if backups else '',
+                                              "Backups (*.bak *.bak.gz)")
+        if not path:
+            return
+        recheck = QMessageBox.question(self, '',
+                                       f'Are you sure to replace ALL DATA with {os.path.basename(path)}?',
+                                       QMessageBox.Yes | QMessageBox.No,
+                                       QMessageBox.No)
+        if recheck == QMessageBox.No:
+            return
+        def restore(path, progress=None):
+            backup.restore_db(path, progress=progress)
+            gendb(journal_mode=setting.journal_mode)  # A backup made by an older version gets the current schema
+            return path
+
+        self.release()
+        worker = self.run_worker("Restoring...", restore, path)
+        worker.done.connect(lambda path: self.refresh())
+        worker.done.connect(lambda path: QMessageBox.information(self, '', f"Restored from {path}"))
+
+    def export_db(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export", "catalog.jsonl", "JSON Lines (*.jsonl)")
+        if not path:
+            return
+        recheck = QMessageBox.question(self, '', 'Include icon, banner and background paths?',
+                                       QMessageBox.Yes | QMessageBox.No,
+                                       QMessageBox.Yes)
+        worker = self.run_worker("Exporting...", exchange.export_catalog, path,
+                                 include_assets=recheck == QMessageBox.Yes)
+        worker.done.connect(lambda count: QMessageBox.information(self, '', f"Exported {count} entries to {path}"))
+
+    def import_db(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Import", '', "JSON Lines (*.jsonl)")
+        if not path:
+            return
+        recheck = QMessageBox.question(self, '', 'Merge into folders with the same name and skip existing apps?',
+                                       QMessageBox.Yes | QMessageBox.No,
+                                       QMessageBox.Yes)
+        worker = self.run_worker("Importing...", exchange.import_catalog, path, merge=recheck == QMessageBox.Yes)
+        worker.done.connect(lambda count: self.refresh())
+        worker.done.connect(lambda count: QMessageBox.information(self, '', f"Imported {count} apps"))
+
+    def refresh(self):
+        pass  # To be modified in slots.py
+
+    def release(self):
+        pass  # To be modified in slots.py, closes the connections of the GUI before data.db is replaced
 
     def clear_db(self):
         try:
@@ -147,8 +370,12 @@ class SettingMenu(QWidget):
                                            QMessageBox.No)
             if recheck == QMessageBox.No:
                 return
-            os.remove("data.db")
-            gendb()
+            self.release()
+            for path in ("data.db", "data.db-wal", "data.db-shm"):
+                if os.path.exists(path):
+                    os.remove(path)
+            gendb(journal_mode=setting.journal_mode)
+            self.refresh()
             QMessageBox.information(self, '', "Database is now cleared")
         except Exception as e:
             QMessageBox.warning(self, "Error", str(e))
@@ -157,10 +384,25 @@ class SettingMenu(QWidget):
         self.close()
 
     def saveData(self):
+        keep = self.backup_keep_value()
+        if keep is None:
+            return
         setting.fontSize['folder_card'] = int(self.base_font_size.text())
         setting.fontSize['app_card'] = round(int(self.base_font_size.text()) * 1.5)
         setting.mode = self.mode.text()
         setting.background = self.background.text()
         setting.background_mask = self.background_mask.text()
+        setting.prewarm['enabled'] = self.prewarm.isChecked()
+        setting.prewarm['apps'] = int(self.prewarm_apps.text())
+        setting.prewarm['budget_mb'] = int(self.prewarm_budget.text())
+        setting.backup['keep'] = keep
+        setting.backup['compress'] = self.backup_compress.isChecked()
+        setting.maintenance['enabled'] = self.maintenance.isChecked()
+        setting.image_budget_mb = int(self.image_budget.text())
+        images.set_budget(setting.image_budget_mb << 20)
+        setting.watchdog['enabled'] = self.watchdog.isChecked()
+        setting.monitor['enabled'] = self.monitor.isChecked()
+        setting.monitor['interval_ms'] = int(self.monitor_interval.text())
+        setting.power_save['enabled'] = self.power_save.isChecked()
         setting.save_to_file()
         self.close()
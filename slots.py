@@ -1,196 +1,378 @@
 import os.path
-import subprocess
-import sqlite3
+import threading
+
+from PySide6.QtWidgets import QInputDialog, QProgressDialog
 
 from ui import *
 from setting import setting
-from window import window
-
-sudo = ['sudo', '-S']
-
-
-def add_folder(name, icon_path, banner_path):
-    conn = sqlite3.connect('data.db')
-    cursor = conn.cursor()
-    cursor.execute('''
-        insert into folder_cards (name, icon_path, banner_path) 
-        values (?, ?, ?)
-        ''', (name, icon_path, banner_path))
-    conn.commit()
-    conn.close()
-
-
-def add_app(name, background_path, parent_folder_id, command, parameters):
-    conn = sqlite3.connect('data.db')
-    cursor = conn.cursor()
-    cursor.execute('''
-        insert into app_cards (name, background_path, parent_folder_id, command, parameters) 
-        values (?, ?, ?, ?, ?)
-        ''', (name, background_path, parent_folder_id, command, parameters))
-    conn.commit()
-    conn.close()
+from window import app, window
+from launcher import build_command, launch
+from groups import launch_group
+import policy
+from worker import Worker
+from query import QueryWorker
+from monitor import Monitor
+from profiling import profiled
+import profiling
+import catalog
+import assets
+import importdb
+import desktop
+
+# Every database read and write of the GUI goes through this thread
+queries = QueryWorker()
+queries.start()
+app.aboutToQuit.connect(queries.stop)
+
+monitor = None
+if setting.monitor['enabled']:
+    monitor = Monitor(window, setting.monitor['interval_ms'])
+    monitor.sampled.connect(lambda app_id, text: show_usage(app_id, text))
+    monitor.finished.connect(lambda summary: queries.submit(catalog.record_session, summary))
+
+
+def warn(self):
+    return lambda message: QMessageBox.warning(self, "Error", message)
+
+
+def current_folder():
+    return type('_', (object,), {
+        'id': window.folder_id
+    })()
+
+
+def row_texts(row):
+    row_data = []
+    for i in range(row.count()):
+        widget = row.itemAt(i).widget()
+        if isinstance(widget, QLineEdit):
+            row_data.append(widget.text() if widget.text() != '' else None)
+    return row_data
 
 
 def save_folders(self):
-    try:
-        for row in self.rows:
-            row_data = []
-            for i in range(row.count()):
-                widget = row.itemAt(i).widget()
-                if isinstance(widget, QLineEdit):
-                    row_data.append(widget.text() if widget.text() != '' else None)
-            add_folder(row_data[0], row_data[1], row_data[2])
+    def done(result):
         refresh_folders()
+        sync_assets()
         self.close()
-    except Exception as e:
-        QMessageBox.warning(self, "Error", str(e))
+
+    rows = [row_texts(row)[:3] for row in self.rows]
+    queries.submit(catalog.add_folders, rows, callback=done, failed=warn(self))
 
 
 def modify_folder(self: ModifyFolderWindow):
-    try:
-        conn = sqlite3.connect('data.db')
-        cursor = conn.cursor()
-        cursor.execute(f"update folder_cards set name = ?, icon_path = ?, banner_path = ? where folder_id = ?",
-                       (self.column1.text() if self.column1.text() != '' else None,
-                        self.column2.text() if self.column2.text() != '' else None,
-                        self.column3.text() if self.column3.text() != '' else None,
-                        self.id))
-        conn.commit()
-        conn.close()
+    def done(result):
         refresh_folders()
+        sync_assets()
         self.close()
-    except Exception as e:
-        QMessageBox.warning(self, "Error", str(e))
+
+    fields = {
+        'name': self.column1.text() if self.column1.text() != '' else None,
+        'icon_path': self.column2.text() if self.column2.text() != '' else None,
+        'banner_path': self.column3.text() if self.column3.text() != '' else None
+    }
+    queries.submit(catalog.update_folders, [self.id], fields, callback=done, failed=warn(self))
 
 
 def remove_folder(self, human_triggered=True):
-    try:
-        if human_triggered:
-            recheck = QMessageBox.question(self, '',
-                                           f'Are you sure to remove {self.title}',
-                                           QMessageBox.Yes | QMessageBox.No,
-                                           QMessageBox.No)
-            if recheck == QMessageBox.No:
-                return
-        conn = sqlite3.connect('data.db')
-        cursor = conn.cursor()
-        cursor.execute(f"delete from folder_cards where folder_id = ?", (self.id,))
-        conn.commit()
-        conn.close()
+    def done(result):
         if human_triggered:
             QMessageBox.information(self, '', f"Removed {self.title}")
             refresh_folders()
-    except Exception as e:
-        QMessageBox.warning(self, 'Error', str(e))
+
+    if human_triggered:
+        recheck = QMessageBox.question(self, '',
+                                       f'Are you sure to remove {self.title}',
+                                       QMessageBox.Yes | QMessageBox.No,
+                                       QMessageBox.No)
+        if recheck == QMessageBox.No:
+            return
+    queries.submit(catalog.remove_folders, [self.id], callback=done, failed=warn(self))
+
+
+def bulk_modify_folders(self: BulkModifyFolderWindow):
+    def done(result):
+        refresh_folders()
+        sync_assets()
+        self.close()
+
+    fields = {}
+    if self.column1.text() != '':
+        fields['icon_path'] = self.column1.text()
+    if self.column2.text() != '':
+        fields['banner_path'] = self.column2.text()
+    queries.submit(catalog.update_folders, self.ids, fields, callback=done, failed=warn(self))
+
+
+def bulk_remove_folders(self, ids):
+    def done(result):
+        QMessageBox.information(self, '', f"Removed {len(ids)} folders")
+        refresh_folders()
+        if window.folder_id in ids:
+            window.folder_id = None
+            window.appList.refresh([])
+
+    recheck = QMessageBox.question(self, '',
+                                   f'Are you sure to remove {len(ids)} folders and all their apps',
+                                   QMessageBox.Yes | QMessageBox.No,
+                                   QMessageBox.No)
+    if recheck == QMessageBox.No:
+        return
+    queries.submit(catalog.remove_folders, ids, callback=done, failed=warn(self))
 
 
 def save_apps(self):
-    try:
-        for row in self.rows:
-            row_data = []
-            for i in range(row.count()):
-                widget = row.itemAt(i).widget()
-                if isinstance(widget, QLineEdit):
-                    row_data.append(widget.text() if widget.text() != '' else None)
-            add_app(row_data[0], row_data[1], window.folder_id, row_data[2], row_data[3])
-        refresh_apps(type('_', (object,), {
-            'id': window.folder_id
-        })())
+    def done(result):
+        refresh_apps(current_folder())
+        sync_assets()
         self.close()
-    except Exception as e:
-        QMessageBox.warning(self, "Error", str(e))
+
+    rows = []
+    for row in self.rows:
+        row_data = row_texts(row)
+        rows.append((row_data[0], row_data[1], window.folder_id, row_data[2], row_data[3]))
+    queries.submit(catalog.add_apps, rows, callback=done, failed=warn(self))
 
 
 def modify_app(self: ModifyAppWindow):
-    try:
-        conn = sqlite3.connect('data.db')
-        cursor = conn.cursor()
-        cursor.execute(
-            f"update app_cards set name = ?, background_path = ?, parent_folder_id = ?, command = ?, parameters = ? where app_id = ?",
-            (self.column1.text() if self.column1.text() != '' else None,
-             self.column2.text() if self.column2.text() != '' else None,
-             window.folder_id,
-             self.column3.text() if self.column3.text() != '' else None,
-             self.column4.text() if self.column4.text() != '' else None,
-             self.id))
-        conn.commit()
-        conn.close()
-        refresh_apps(type('_', (object,), {
-            'id': window.folder_id
-        })())
+    def done(result):
+        refresh_apps(current_folder())
+        sync_assets()
         self.close()
-    except Exception as e:
+
+    try:
+        fields = {
+            'name': self.column1.text() if self.column1.text() != '' else None,
+            'background_path': self.column2.text() if self.column2.text() != '' else None,
+            'parent_folder_id': window.folder_id,
+            'command': self.column3.text() if self.column3.text() != '' else None,
+            'parameters': self.column4.text() if self.column4.text() != '' else None,
+            'cpu_affinity': self.column5.text() if self.column5.text() != '' else None,
+            'nice': int(self.column6.text()) if self.column6.text() != '' else None,
+            'ioprio': self.column7.text() if self.column7.text() != '' else None,
+            'cgroup': self.column8.text() if self.column8.text() != '' else None,
+            'working_dir': self.column9.text() if self.column9.text() != '' else None
+        }
+        policy.check(fields['cpu_affinity'], fields['nice'], fields['ioprio'], fields['cgroup'], fields['working_dir'])
+    except ValueError as e:
         QMessageBox.warning(self, "Error", str(e))
+        return
+    queries.submit(catalog.update_apps, [self.id], fields, callback=done, failed=warn(self))
 
 
 def remove_app(self, human_trigger=True):
-    try:
-        if human_trigger:
-            recheck = QMessageBox.question(self, '',
-                                           f'Are you sure to remove {self.title}',
-                                           QMessageBox.Yes | QMessageBox.No,
-                                           QMessageBox.No)
-            if recheck == QMessageBox.No:
-                return
-        conn = sqlite3.connect('data.db')
-        cursor = conn.cursor()
-        cursor.execute(f"delete from app_cards where app_id = ?", (self.id,))
-        conn.commit()
-        conn.close()
+    def done(result):
         if human_trigger:
             QMessageBox.information(self, '', f"Removed {self.title}")
-            refresh_apps(type('_', (object,), {
-                'id': window.folder_id
-            })())
-    except Exception as e:
-        QMessageBox.warning(self, 'Error', str(e))
+            refresh_apps(current_folder())
+
+    if human_trigger:
+        recheck = QMessageBox.question(self, '',
+                                       f'Are you sure to remove {self.title}',
+                                       QMessageBox.Yes | QMessageBox.No,
+                                       QMessageBox.No)
+        if recheck == QMessageBox.No:
+            return
+    queries.submit(catalog.remove_apps, [self.id], callback=done, failed=warn(self))
+
+
+def bulk_modify_apps(self: BulkModifyAppWindow):
+    def done(result):
+        refresh_apps(current_folder())
+        sync_assets()
+        self.close()
+
+    fields = {}
+    if self.column1.text() != '':
+        fields['background_path'] = self.column1.text()
+    if self.column2.text() != '':
+        fields['command'] = self.column2.text()
+    if self.column3.text() != '':
+        fields['parameters'] = self.column3.text()
+    queries.submit(catalog.update_apps, self.ids, fields, callback=done, failed=warn(self))
+
+
+def bulk_move_apps(self, ids):
+    def move(folders):
+        names = [name for _, name in folders]
+        name, ok = QInputDialog.getItem(self, '', f'Move {len(ids)} apps to', names, 0, False)
+        if ok:
+            queries.submit(catalog.update_apps, ids, {'parent_folder_id': folders[names.index(name)][0]},
+                           callback=lambda result: refresh_apps(current_folder()), failed=warn(self))
+
+    queries.submit(catalog.list_folders, callback=move, failed=warn(self))
+
+
+def bulk_remove_apps(self, ids):
+    def done(result):
+        QMessageBox.information(self, '', f"Removed {len(ids)} apps")
+        refresh_apps(current_folder())
+
+    recheck = QMessageBox.question(self, '',
+                                   f'Are you sure to remove {len(ids)} apps',
+                                   QMessageBox.Yes | QMessageBox.No,
+                                   QMessageBox.No)
+    if recheck == QMessageBox.No:
+        return
+    queries.submit(catalog.remove_apps, ids, callback=done, failed=warn(self))
 
 
 def refresh_folders(reverse_order=False):
-    conn = sqlite3.connect('data.db')
-    cursor = conn.cursor()
-    cursor.execute(f"select * from folder_cards order by name {'desc' if reverse_order else ''}")
-    data = cursor.fetchall()
-    conn.close()
+    queries.submit(catalog.folder_cards, reverse_order, key='folders', callback=show_folders)
 
-    folderCards = []
-    for id, name, icon_path, banner_path in data:
-        folderCard = FolderCard(id, name, icon_path, banner_path, 'default')
-        folderCards.append(folderCard)
 
-    window.folderList.refresh(folderCards)
+def show_folders(rows):
+    window.folderList.refresh(rows)
 
 
 def refresh_apps(self):
+    # Rapid folder switching only ever renders the last folder clicked
     window.folder_id = self.id
-    conn = sqlite3.connect('data.db')
-    cursor = conn.cursor()
-    cursor.execute(f"select * from app_cards where parent_folder_id={self.id} order by app_id")
-    data = cursor.fetchall()
-    conn.close()
+    queries.submit(catalog.app_cards, self.id, key='apps', callback=show_apps)
+
 
-    appCards = []
-    for id, name, background_path, parent_folder_id, command, parameters in data:
-        if command is None:
-            command = ''
-        if parameters is None:
-            parameters = ''
-        parameters = parameters.split()
-        appCard = AppCard(id, name, background_path, parent_folder_id, [command], parameters, 'default')
-        appCards.append(appCard)
+def show_apps(rows):
+    window.appList.refresh(rows)
 
-    window.appList.refresh(appCards)
+
+asset_worker = None
+asset_sync_again = False
+
+
+def sync_assets(full=False):
+    # Only one sync runs at a time, requests made meanwhile start another pass once it finishes
+    global asset_worker, asset_sync_again
+    if asset_worker is not None and asset_worker.isRunning():
+        asset_sync_again = True
+        return
+    asset_worker = Worker(assets.sync, full=full)
+    asset_worker.done.connect(assets_synced)
+    asset_worker.failed.connect(lambda message: print('[sync_assets] Failed:', message))
+    asset_worker.finished.connect(assets_sync_finished)
+    asset_worker.start()
+
+
+def assets_synced(changed):
+    if changed == 0:
+        return
+    refresh_folders()
+    if window.folder_id is not None:
+        refresh_apps(current_folder())
+
+
+def assets_sync_finished():
+    global asset_sync_again
+    if asset_sync_again:
+        asset_sync_again = False
+        sync_assets()
 
 
 def run_command(self):
-    self.command.extend(self.parameters)
-    if setting.platform['enable_sudo']:
-        print('[run_command] Run:', sudo + self.command)
-        p = subprocess.Popen(sudo + self.command, text=True, stdin=subprocess.PIPE)
-        p.communicate(setting.platform['password'] + '\n')
+    process = launch(self.command + self.parameters, setting.platform['enable_sudo'], setting.platform['password'],
+                     self.policy)
+    queries.submit(catalog.record_launch, self.id)
+    if monitor is not None:
+        monitor.track(process, self.id)
+
+
+def show_usage(app_id, text):
+    for appCard in window.appList.content:
+        if appCard.id == app_id:
+            appCard.setUsage(text)
+
+
+group_workers = []
+
+
+def group_members(conn, name):
+    group_id = catalog.find_group(conn, name)
+    return None if group_id is None else catalog.group_members(conn, group_id)
+
+
+def run_group(name):
+    def start(members):
+        if members is None:
+            print('[run_group] No such group:', name)
+            return
+        worker = Worker(launch_group, members, setting.platform['enable_sudo'], setting.platform['password'])
+        worker.done.connect(group_launched)
+        worker.failed.connect(lambda message: QMessageBox.warning(window, "Error", message))
+        worker.finished.connect(lambda: group_workers.remove(worker))
+        group_workers.append(worker)
+        worker.start()
+
+    queries.submit(group_members, name, callback=start)
+
+
+def group_launched(results):
+    for result in results:
+        if result['started'] is not None:
+            queries.submit(catalog.record_launch, result['app_id'])
+            if monitor is not None:
+                monitor.track(result['process'], result['app_id'])
+    failed = [result['name'] for result in results if result['status'] != 'ready']
+    if failed:
+        QMessageBox.warning(window, "Error", f"Not ready: {', '.join(failed)}")
+
+
+def choose_group(self):
+    def choose(groups):
+        if not groups:
+            QMessageBox.information(self, '', "No launch groups yet, create one with cli.py group")
+            return
+        name, ok = QInputDialog.getItem(self, '', 'Launch group', [name for _, name in groups], 0, False)
+        if ok:
+            run_group(name)
+
+    queries.submit(catalog.list_groups, callback=choose, failed=warn(self))
+
+
+def refresh_catalog(self):
+    # The whole database was replaced or imported
+    refresh_folders()
+    sync_assets()
+
+
+def handle_request(request):
+    # Requests forwarded by a second invocation of main.py, see instance.py
+    print('[handle_request] Received:', request)
+    action, _, argument = request.partition(' ')
+    if action == 'show':
+        window.showNormal()
+        window.raise_()
+        window.activateWindow()
+    elif action == 'open':
+        queries.submit(catalog.find_folder, argument, callback=lambda folder_id: open_folder(argument, folder_id))
+    elif action == 'launch':
+        queries.submit(catalog.find_app, argument, callback=lambda app: launch_app(argument, app))
+    elif action == 'group':
+        run_group(argument)
     else:
-        print('[run_command] Run:', self.command)
-        subprocess.Popen(self.command)
+        print('[handle_request] Unknown request:', request)
+
+
+def open_folder(name, folder_id):
+    if folder_id is None:
+        print('[handle_request] No such folder:', name)
+        return
+    refresh_apps(type('_', (object,), {
+        'id': folder_id
+    })())
+    window.raise_()
+    window.activateWindow()
+
+
+def launch_app(spec, app):
+    if app is None:
+        print('[handle_request] No such app:', spec)
+        return
+    app_id, command, parameters, *launch_policy = app
+    run_command(type('_', (object,), {
+        'id': app_id,
+        'command': build_command(command, parameters),
+        'parameters': [],
+        'policy': launch_policy
+    })())
 
 
 def dragEnterEvent(self, event):
@@ -207,31 +389,83 @@ def dropEvent(self, event):
         self.setText(path)
 
 
-AddFolderWindow.saveData = save_folders
-ModifyFolderWindow.saveData = modify_folder
-FolderCard.remove = remove_folder
-AddAppWindow.saveData = save_apps
-ModifyAppWindow.saveData = modify_app
-AppCard.remove = remove_app
-FolderCard.clicked = refresh_apps
-AppCard.clicked = run_command
+def run_import(self, status, function, *args, **kwargs):
+    # Runs an import on a Worker behind a progress dialog whose Cancel button stops it,
+    # status turns the (done, total) progress into the dialog text
+    def update(done, total):
+        self.progressDialog.setMaximum(total)
+        self.progressDialog.setValue(done)
+        self.progressDialog.setLabelText(status(done, total))
 
-QLineEdit.dragEnterEvent = dragEnterEvent
-QLineEdit.dropEvent = dropEvent
+    def done(count):
+        refresh_folders()
+        sync_assets()
+        cancelling = ' before cancelling' if cancelled.is_set() else ''
+        QMessageBox.information(self, '', f"Imported {count} apps{cancelling}")
+        self.close()
 
-if sys.platform == 'win32':
-    from importdb import process_folders_and_shortcuts
+    cancelled = threading.Event()
+    self.progressDialog = QProgressDialog("Importing...", "Cancel", 0, 0, self)
+    self.progressDialog.setMinimumDuration(0)
+    self.progressDialog.canceled.connect(cancelled.set)
+    self.worker = Worker(function, *args, cancelled=cancelled, **kwargs)
+    self.worker.progress.connect(update)
+    self.worker.done.connect(done)
+    self.worker.failed.connect(warn(self))
+    self.worker.finished.connect(self.progressDialog.close)
+    self.worker.start()
 
 
-    def import_from_dic(self):
-        try:
-            path = self.path.text()
-            assert os.path.isdir(path)
-            process_folders_and_shortcuts(path)
-            refresh_folders()
-            self.close()
-        except Exception as e:
-            QMessageBox.warning(self, "Error", str(e))
+def import_desktop_entries(self):
+    # The XDG application directories, one folder per category
+    run_import(self, lambda read, total: f"Read {read} of {total} entries", desktop.import_entries)
+
+
+def import_tree(self):
+    # Directories below the path become folders, apps show up batch by batch while the walk goes on
+    path = self.path.text()
+    if not os.path.isdir(path):
+        QMessageBox.warning(self, "Error", f"{path} is not a directory")
+        return
+    run_import(self, lambda scanned, found: f"Scanned {scanned} of {found} directories",
+               importdb.import_tree, path, depth=self.depth.value())
+
 
+def import_from_dic(self):
+    if self.path.text() == '' and sys.platform == 'linux':
+        import_desktop_entries(self)
+    else:
+        import_tree(self)
+
+
+# Set YUZU_PROFILE=timing|cprofile (or "profile" in settings.json) to wrap every binding below
+profiling.configure(os.environ.get('YUZU_PROFILE', setting.profile))
+refresh_folders = profiled('refresh_folders', refresh_folders)
+refresh_apps = profiled('refresh_apps', refresh_apps)
+show_folders = profiled('show_folders', show_folders)
+show_apps = profiled('show_apps', show_apps)
+sync_assets = profiled('sync_assets', sync_assets)
+handle_request = profiled('handle_request', handle_request)
+
+AddFolderWindow.saveData = profiled('save_folders', save_folders)
+ModifyFolderWindow.saveData = profiled('modify_folder', modify_folder)
+FolderCard.remove = profiled('remove_folder', remove_folder)
+AddAppWindow.saveData = profiled('save_apps', save_apps)
+ModifyAppWindow.saveData = profiled('modify_app', modify_app)
+AppCard.remove = profiled('remove_app', remove_app)
+FolderCard.clicked = refresh_apps
+AppCard.clicked = profiled('run_command', run_command)
+FolderCard.selected = lambda self: window.folderList.selectedIds()
+FolderCard.bulkRemove = profiled('bulk_remove_folders', bulk_remove_folders)
+BulkModifyFolderWindow.saveData = profiled('bulk_modify_folders', bulk_modify_folders)
+AppCard.selected = lambda self: window.appList.selectedIds()
+AppCard.bulkMove = profiled('bulk_move_apps', bulk_move_apps)
+AppCard.bulkRemove = profiled('bulk_remove_apps', bulk_remove_apps)
+BulkModifyAppWindow.saveData = profiled('bulk_modify_apps', bulk_modify_apps)
+SettingMenu.refresh = profiled('refresh_catalog', refresh_catalog)
+SettingMenu.release = lambda self: queries.release()
+MainWindow.launchGroup = profiled('choose_group', choose_group)
+Import.saveData = profiled('import_from_dic', import_from_dic)
 
-    Import.saveData = import_from_dic
+QLineEdit.dragEnterEvent = dragEnterEvent
+QLineEdit.dropEvent = dropEvent
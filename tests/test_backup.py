@@ -0,0 +1,23 @@
+import pytest
+
+import backup
+from gendb import gendb
+
+
+def test_keep_must_be_at_least_one(tmp_path):
+    db_path = str(tmp_path / 'data.db')
+    gendb(db_path)
+    with pytest.raises(ValueError):
+        backup.backup_db(db_path, keep=0)
+    assert backup.list_backups(db_path) == []
+
+
+def test_rotate_keeps_the_newest(tmp_path):
+    db_path = str(tmp_path / 'data.db')
+    for stamp in ('20240101-000000', '20240102-000000', '20240103-000000'):
+        (tmp_path / f'data.db.{stamp}.bak').touch()
+    backup.rotate(db_path, keep=2)
+    assert backup.list_backups(db_path) == [str(tmp_path / 'data.db.20240102-000000.bak'),
+                                            str(tmp_path / 'data.db.20240103-000000.bak')]
+    backup.rotate(db_path, keep=0)
+    assert backup.list_backups(db_path) == []
@@ -0,0 +1,48 @@
+import catalog
+import exchange
+from gendb import gendb
+
+
+def test_policy_survives_a_round_trip(tmp_path):
+    source, target, export = (str(tmp_path / name) for name in ('source.db', 'target.db', 'export.jsonl'))
+    cgroup = tmp_path / 'games'  # Stands in for a cgroup directory, policy.check() only looks for cgroup.procs
+    cgroup.mkdir()
+    (cgroup / 'cgroup.procs').touch()
+    policy = ('0', 5, 'best-effort:4', str(cgroup), str(tmp_path))
+    gendb(source)
+    conn = catalog.connect(source)
+    with conn:
+        conn.execute("insert into folder_cards (name) values ('Games')")
+        conn.execute("insert into app_cards (name, parent_folder_id, command, cpu_affinity, nice, ioprio, cgroup, "
+                     "working_dir) values ('Game', 1, '/opt/game/run', ?, ?, ?, ?, ?)", policy)
+    conn.close()
+
+    exchange.export_catalog(export, source)
+    gendb(target)
+    assert exchange.import_catalog(export, target) == 1
+    conn = catalog.connect(target)
+    assert conn.execute("select cpu_affinity, nice, ioprio, cgroup, working_dir from app_cards").fetchall() == [policy]
+    conn.close()
+
+
+def test_invalid_policy_values_are_dropped(tmp_path):
+    export, target = tmp_path / 'bad.jsonl', str(tmp_path / 'target.db')
+    export.write_text('{"type": "catalog", "version": 1}\n{"type": "folder", "id": 1, "name": "Games"}\n'
+                      '{"type": "app", "folder": 1, "name": "Game", "command": "/opt/game/run", "nice": 5, '
+                      '"ioprio": "be/4", "working_dir": "' + str(tmp_path / 'missing') + '"}\n')
+    gendb(target)
+    assert exchange.import_catalog(str(export), target) == 1
+    conn = catalog.connect(target)
+    assert conn.execute("select nice, ioprio, working_dir from app_cards").fetchall() == [(5, None, None)]
+    conn.close()
+
+
+def test_older_exports_still_import(tmp_path):
+    export, target = tmp_path / 'old.jsonl', str(tmp_path / 'target.db')
+    export.write_text('{"type": "catalog", "version": 1}\n{"type": "folder", "id": 7, "name": "Tools"}\n'
+                      '{"type": "app", "folder": 7, "name": "Editor", "command": "/usr/bin/vi", "parameters": null}\n')
+    gendb(target)
+    assert exchange.import_catalog(str(export), target) == 1
+    conn = catalog.connect(target)
+    assert conn.execute("select name, nice, working_dir from app_cards").fetchall() == [('Editor', None, None)]
+    conn.close()
@@ -0,0 +1,36 @@
+import os
+import sys
+import subprocess
+
+import pytest
+
+pytest.importorskip('PySide6.QtNetwork')
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Stands in for the primary instance: serves the socket of main.py and prints every request it gets
+primary = '''
+from PySide6.QtCore import QCoreApplication, QTimer
+from instance import InstanceServer
+
+app = QCoreApplication([])
+server = InstanceServer()
+server.received.connect(lambda request: (print(request, flush=True), app.quit()))
+print('ready' if server.start() else 'failed', flush=True)
+QTimer.singleShot(10000, app.quit)
+app.exec()
+'''
+
+
+def test_second_invocation_forwards_and_exits(tmp_path):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get('PYTHONPATH')])))
+    server = subprocess.Popen([sys.executable, '-c', primary], cwd=tmp_path, env=env, stdout=subprocess.PIPE, text=True)
+    try:
+        assert server.stdout.readline().strip() == 'ready'
+        second = subprocess.run([sys.executable, os.path.join(root, 'main.py'), 'open', 'Games'],
+                                cwd=tmp_path, env=env, capture_output=True, text=True, timeout=10)
+        assert second.returncode == 0
+        assert server.stdout.readline().strip() == 'open Games'
+        assert server.wait(10) == 0
+    finally:
+        server.kill()
@@ -0,0 +1,69 @@
+import os
+import time
+import threading
+
+import launcher
+
+fake_sudo = '''#!/bin/sh
+# Stands in for sudo -S: reads the password from stdin, then runs the command a little later
+read password
+[ "$password" = "secret" ] || exit 99
+shift
+sleep 0.3
+exec "$@"
+'''
+
+
+def test_sudo_launch_returns_at_once_and_reaps(tmp_path, monkeypatch):
+    sudo = tmp_path / 'sudo'
+    sudo.write_text(fake_sudo)
+    sudo.chmod(0o755)
+    monkeypatch.setenv('PATH', f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+
+    exited = {}
+    done = threading.Event()
+
+    def listener(process, returncode):
+        exited[process.pid] = returncode
+        if len(exited) == 2:
+            done.set()
+
+    monkeypatch.setattr(launcher, 'listeners', [listener])
+    start = time.monotonic()
+    first = launcher.launch(['sh', '-c', 'exit 3'], enable_sudo=True, password='secret')
+    second = launcher.launch(['sh', '-c', 'exit 0'], enable_sudo=True, password='secret')
+    assert time.monotonic() - start < 0.2  # The fake sudo alone takes 0.3 s per child
+
+    assert done.wait(5)
+    assert exited == {first.pid: 3, second.pid: 0}
+    assert first not in launcher.running() and second not in launcher.running()
+
+
+def test_wrong_password_is_reported(tmp_path, monkeypatch):
+    sudo = tmp_path / 'sudo'
+    sudo.write_text(fake_sudo)
+    sudo.chmod(0o755)
+    monkeypatch.setenv('PATH', f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+
+    exited = []
+    done = threading.Event()
+
+    def listener(process, returncode):
+        exited.append(returncode)
+        done.set()
+
+    monkeypatch.setattr(launcher, 'listeners', [listener])
+    launcher.launch(['true'], enable_sudo=True, password='wrong')
+    assert done.wait(5)
+    assert exited == [99]
+
+
+def test_stdin_is_closed_when_sudo_does_not_read_it(tmp_path, monkeypatch):
+    sudo = tmp_path / 'sudo'
+    sudo.write_text('#!/bin/sh\n# Stands in for sudo with cached credentials: never reads the password\nshift\nexec "$@"\n')
+    sudo.chmod(0o755)
+    monkeypatch.setenv('PATH', f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+
+    # Larger than a pipe buffer, so writing it fails once the child has exited
+    process = launcher.launch(['true'], enable_sudo=True, password='x' * (1 << 20))
+    assert process.stdin.closed
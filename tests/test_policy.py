@@ -0,0 +1,34 @@
+import os
+import sys
+
+import pytest
+
+import launcher
+
+pytestmark = pytest.mark.skipif(sys.platform != 'linux', reason='reads /proc')
+
+
+def status(pid, name):
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            if key == name:
+                return value.strip()
+
+
+def nice(pid):
+    with open(f'/proc/{pid}/stat') as f:
+        return int(f.read().rpartition(')')[2].split()[16])  # Field 19, counted after the command name
+
+
+def test_affinity_and_nice_are_applied_before_exec():
+    cpu = min(os.sched_getaffinity(0))
+    value = min(19, os.getpriority(os.PRIO_PROCESS, 0) + 5)  # Raising nice needs no privileges
+    process = launcher.launch(['sleep', '5'], policy=(str(cpu), value, None, None))
+    try:
+        assert status(process.pid, 'Cpus_allowed_list') == str(cpu)
+        assert nice(process.pid) == value
+    finally:
+        process.kill()
+        process.wait()
+
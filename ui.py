@@ -3,16 +3,20 @@ from dataclasses import dataclass
 
 from PySide6.QtWidgets import (QMainWindow, QMessageBox, QListWidget, QListWidgetItem, QScrollArea,
                                QWidget, QHBoxLayout, QGridLayout, QVBoxLayout, QLabel, QPushButton,
-                               QLineEdit, QMenu, QSpacerItem, QSizePolicy)
-from PySide6.QtGui import QIcon, QFont, QPixmap, QPainter, QPaintEvent
-from PySide6.QtCore import Qt, QSize, QTimer, QRect
+                               QLineEdit, QMenu, QSpacerItem, QSizePolicy, QAbstractItemView,
+                               QStyle, QSpinBox)
+from PySide6.QtGui import QFont, QPixmap, QPainter, QPaintEvent, QStaticText, QTransform
+from PySide6.QtCore import Qt, QSize, QTimer, QRect, QPointF, QEvent, QVariantAnimation
 
 from setting import setting, SettingMenu
+import assets
+import images
 
 
 def clear_layout(layout):
+    # deleteLater() rather than setParent(None), which turns every widget into a hidden window first
     for i in reversed(range(layout.count())):
-        layout.takeAt(i).widget().setParent(None)
+        layout.takeAt(i).widget().deleteLater()
 
 
 class Edge(enum.Flag):
@@ -42,27 +46,58 @@ class EdgePress:
 
 
 class QMarqueeLabel(QLabel):
+    animate = True  # Cleared in low-power mode, see powersave.py
+
     def __init__(self, text="", parent=None, font='default', font_size=20, always_scroll=False):
         super().__init__(text, parent)
         self.always_scroll = always_scroll
         self.offset = 0
-        self.setFont(QFont(setting.font[font], font_size))
         self.enableScroll = False
-
+        self.textWidth = 0
+        self.textTop = 0
+        self.staticText = QStaticText()
         self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
         self.timer.timeout.connect(self._update_offset)
-        self.timer.start(40)
-
-        self.needScroll = self.fontMetrics().horizontalAdvance(self.text()) > (self.width() - 10)
+        self.setFont(QFont(setting.font[font], font_size))
+        self.layoutText()
+
+    def layoutText(self):
+        # Measured and laid out once per text and font, a scroll frame only draws it at a new offset
+        self.staticText = QStaticText(self.text())
+        self.staticText.setTextFormat(Qt.PlainText)
+        self.staticText.prepare(QTransform(), self.font())
+        self.textWidth = self.fontMetrics().horizontalAdvance(self.text())
+        self.placeText()
+
+    def placeText(self):
+        self.needScroll = self.textWidth > (self.width() - 10)
+        if self.animate and self.needScroll and self.always_scroll and not self.timer.isActive():
+            self.timer.start(40)
+        textHeight = self.staticText.size().height()
+        if self.alignment() & Qt.AlignTop:
+            self.textTop = 0
+        elif self.alignment() & Qt.AlignBottom:
+            self.textTop = self.height() - textHeight
+        else:
+            self.textTop = (self.height() - textHeight) / 2
 
     def setText(self, text):
         super().setText(text)
+        self.layoutText()
         self._update_offset()
 
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.FontChange:  # Also raised by style sheets setting font-size
+            self.layoutText()
+
     def enterEvent(self, event):
         if self.always_scroll:
             return
         self.enableScroll = True
+        if self.animate and not self.timer.isActive():
+            self.timer.start(40)
 
     def leaveEvent(self, event):
         if self.always_scroll:
@@ -71,51 +106,96 @@ class QMarqueeLabel(QLabel):
 
     def resizeEvent(self, event):
         super().resizeEvent(event)  # Ensure the base class resize event is called
-        self.needScroll = self.fontMetrics().horizontalAdvance(self.text()) > (self.width() - 10)
+        self.placeText()
 
     def _update_offset(self):
-        if self.needScroll and (self.enableScroll or self.always_scroll):
+        if self.animate and self.needScroll and (self.enableScroll or self.always_scroll):
             self.offset -= 1  # Adjust scrolling speed here
-            if self.offset < -self.fontMetrics().horizontalAdvance(self.text()):
+            if self.offset < -self.textWidth:
                 self.offset = self.width()
             self.update()
             self.timer.start(40)
-        else:
+        elif self.offset != 0:
+            # Back to the plain label, the timer stays off until scrolling starts again
             self.offset = 0
             self.update()
 
     def paintEvent(self, event: QPaintEvent):
         if self.needScroll and (self.enableScroll or self.always_scroll):
             painter = QPainter(self)
-            textWidth = self.fontMetrics().horizontalAdvance(self.text())
-            painter.drawText(QRect(self.offset, 0, textWidth, self.height()), self.alignment(), self.text())
+            painter.drawStaticText(QPointF(self.offset, self.textTop), self.staticText)
         else:
             super().paintEvent(event)
 
 
+class FadeLabel(QLabel):
+    # Shows a placeholder until setImage(), then fades the image in over it
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.image = None
+        self.opacity = 1.0
+        self.animation = QVariantAnimation(self)
+        self.animation.setStartValue(0.0)
+        self.animation.setEndValue(1.0)
+        self.animation.setDuration(200)
+        self.animation.valueChanged.connect(self.fade)
+        self.animation.finished.connect(self.faded)
+
+    def setImage(self, pixmap):
+        if pixmap.isNull():
+            return
+        # Cache hits arrive before the card is shown, they and cards without a placeholder skip the fade
+        if not self.isVisible() or self.pixmap().isNull() or not QMarqueeLabel.animate:
+            self.setPixmap(pixmap)
+            return
+        self.image = pixmap
+        self.animation.start()
+
+    def fade(self, value):
+        self.opacity = value
+        self.update()
+
+    def faded(self):
+        self.setPixmap(self.image)
+        self.image = None
+
+    def paintEvent(self, event):
+        if self.image is None:
+            super().paintEvent(event)
+            return
+        painter = QPainter(self)
+        for pixmap, opacity in ((self.pixmap(), 1.0), (self.image, self.opacity)):
+            painter.setOpacity(opacity)
+            painter.drawPixmap(QStyle.alignedRect(self.layoutDirection(), self.alignment(), pixmap.size(),
+                                                  self.contentsRect()), pixmap)
+
+
 class FolderCard(QWidget):
-    def __init__(self, id, title, icon_path, banner_path, font='default'):
+    def __init__(self, row, font='default'):
+        # row is a catalog.FolderRow
         super().__init__()
-        self.id = id
-        self.title = title
-        self.icon_path = icon_path
-        self.banner_path = banner_path
+        self.row = row
+        self.id = row.id
+        self.title = row.title
+        self.icon_path = row.icon_path
+        self.banner_path = row.banner_path
         self.font = font
         self.layout = QHBoxLayout()
         self.subWindow = None
 
-        # Icon
-        self.iconLabel = QLabel()
+        # Icon, a placeholder from the stored preview until the decoded icon arrives
+        self.iconLabel = FadeLabel()
         self.iconLabel.setFixedSize(70, 70)
-        self.iconLabel.setPixmap(QIcon(icon_path).pixmap(self.iconLabel.size()))
         self.iconLabel.setAlignment(Qt.AlignCenter)
+        self.iconLabel.setPixmap(assets.placeholder(row.icon_info, 'icon'))
+        assets.load_async(row.icon_path, row.icon_asset, 'icon', self.iconLabel.setImage)
 
         # Divider
         self.divider = QLabel()
         self.divider.setFixedWidth(10)
 
         # Title
-        self.titleLabel = QMarqueeLabel(title, self, 'default', setting.fontSize['folder_card'])
+        self.titleLabel = QMarqueeLabel(row.title, self, 'default', setting.fontSize['folder_card'])
         self.titleLabel.setAlignment(Qt.AlignLeft | Qt.AlignVCenter)
 
         # Layout
@@ -129,13 +209,31 @@ class FolderCard(QWidget):
     def clicked(self):
         pass  # To be modified dynamically in slots.py
 
+    def selected(self):
+        return []  # To be modified dynamically in slots.py
+
     def mousePressEvent(self, event):
-        if event.button() == Qt.LeftButton:
+        # Ctrl/Shift clicks only change the selection of the FolderList
+        if event.button() == Qt.LeftButton and not event.modifiers() & (Qt.ControlModifier | Qt.ShiftModifier):
             self.clicked()
         super().mousePressEvent(event)
 
     def contextMenuEvent(self, event):
         contextMenu = QMenu(self)
+        selected = self.selected()
+
+        if len(selected) > 1 and self.id in selected:
+            modify = contextMenu.addAction(f"Modify {len(selected)} Folders")
+            remove = contextMenu.addAction(f"Remove {len(selected)} Folders")
+
+            action = contextMenu.exec(self.mapToGlobal(event.pos()))
+
+            if action == modify:
+                self.subWindow = BulkModifyFolderWindow(selected)
+                self.subWindow.show()
+            if action == remove:
+                self.bulkRemove(selected)
+            return
 
         modify = contextMenu.addAction("Modify")
         remove = contextMenu.addAction("Remove")
@@ -154,41 +252,55 @@ class FolderCard(QWidget):
     def remove(self):
         pass
 
-    def clone(self):
-        return FolderCard(self.id, self.title, self.icon_path, self.banner_path, self.font)
+    def bulkRemove(self, ids):
+        pass  # To be modified dynamically in slots.py
 
 
 class AppCard(QWidget):
-    def __init__(self, id, title, image_path, parent_folder_id, command, parameters, font='default'):
+    def __init__(self, row, font='default'):
+        # row is a catalog.AppRow
         super(AppCard, self).__init__()
-        self.id = id
-        self.title = title
-        self.image_path = image_path
-        self.parent_folder_id = parent_folder_id,
-        self.command = command
-        self.parameters = parameters
-        self._font = font
+        self.row = row
+        self.id = row.id
+        self.title = row.title
+        self.image_path = row.image_path
+        self.policy = row.policy  # (cpu_affinity, nice, ioprio, cgroup, working_dir)
+        self.parent_folder_id = row.parent_folder_id
+        self.command = [row.command if row.command is not None else '']
+        self.parameters = row.parameters.split() if row.parameters is not None else []
         self.setFixedSize(300, 300)
         self.subWindow = None
 
-        # Background image
-        self.backgroundLabel = QLabel(self)
-        try:
-            pixmap = QPixmap(image_path).scaled(300, 300, Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation)
-            self.backgroundLabel.setPixmap(pixmap)
-        except Exception as e:
-            pixmap = QPixmap('default_icon.png').scaled(300, 300, Qt.KeepAspectRatioByExpanding,
-                                                        Qt.SmoothTransformation)
-            self.backgroundLabel.setPixmap(pixmap)
+        # Background image, a placeholder from the stored preview until the decoded image arrives
+        self.backgroundLabel = FadeLabel(self)
+        if row.image_path is not None:
+            self.backgroundLabel.setPixmap(assets.placeholder(row.image_info, 'card'))
+            assets.load_async(row.image_path, row.image_asset, 'card', self.backgroundLabel.setImage, crop=True)
+        else:
+            self.backgroundLabel.setPixmap(images.load('default_icon.png', 300, 300, Qt.KeepAspectRatioByExpanding,
+                                                       crop=True))
         self.backgroundLabel.setGeometry(0, 0, 300, 300)
 
+        # Selection frame
+        self.selectedFrame = QLabel(self)
+        self.selectedFrame.setStyleSheet("border: 4px solid rgba(252, 201, 185, 0.8);")
+        self.selectedFrame.setGeometry(0, 0, 300, 300)
+        self.selectedFrame.hide()
+        self.isSelected = False
+
+        # Live figures of the running app, see monitor.py
+        self.usageLabel = QLabel(self)
+        self.usageLabel.setStyleSheet("color: white; background-color: rgba(0, 0, 0, 160); padding: 4px;")
+        self.usageLabel.move(8, 8)
+        self.usageLabel.hide()
+
         # Overlay
         overlay = QLabel(self)
         overlay.setStyleSheet("background-color: rgba(0, 0, 0, 128);")
         overlay.setGeometry(0, 200, 300, 100)
 
         # Title
-        self.titleLabel = QMarqueeLabel(title, overlay, font, setting.fontSize['app_card'], True)
+        self.titleLabel = QMarqueeLabel(row.title, overlay, font, setting.fontSize['app_card'], True)
         self.titleLabel.setGeometry(10, 0, 280, 100)
         self.titleLabel.setStyleSheet(f"color: white;"
                                       f"font-size: {setting.fontSize['app_card']}px;"
@@ -197,21 +309,58 @@ class AppCard(QWidget):
     def clicked(self):
         pass  # To be modified dynamically in slots.py
 
+    def selected(self):
+        return []  # To be modified dynamically in slots.py
+
+    def setSelected(self, selected):
+        self.isSelected = selected
+        self.selectedFrame.setVisible(selected)
+
+    def setUsage(self, text):
+        self.usageLabel.setText(text)
+        self.usageLabel.adjustSize()
+        self.usageLabel.setVisible(text != '')
+
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
-            self.clicked()
+            if event.modifiers() & Qt.ControlModifier:
+                self.setSelected(not self.isSelected)
+            else:
+                self.clicked()
         super().mousePressEvent(event)
 
     def contextMenuEvent(self, event):
         contextMenu = QMenu(self)
+        selected = self.selected()
+        if self.id not in selected:
+            selected = [self.id]
+
+        if len(selected) > 1:
+            modify = contextMenu.addAction(f"Modify {len(selected)} Apps")
+            move = contextMenu.addAction(f"Move {len(selected)} Apps to...")
+            remove = contextMenu.addAction(f"Remove {len(selected)} Apps")
+
+            action = contextMenu.exec(self.mapToGlobal(event.pos()))
+
+            if action == modify:
+                self.subWindow = BulkModifyAppWindow(selected)
+                self.subWindow.show()
+            if action == move:
+                self.bulkMove(selected)
+            if action == remove:
+                self.bulkRemove(selected)
+            return
 
         modify = contextMenu.addAction("Modify")
+        move = contextMenu.addAction("Move to...")
         remove = contextMenu.addAction("Remove")
 
         action = contextMenu.exec(self.mapToGlobal(event.pos()))
 
         if action == modify:
             self.modify()
+        if action == move:
+            self.bulkMove(selected)
         if action == remove:
             self.remove()
 
@@ -222,9 +371,11 @@ class AppCard(QWidget):
     def remove(self):
         pass
 
-    def clone(self):
-        return AppCard(self.id, self.title, self.image_path, self.parent_folder_id, self.command, self.parameters,
-                       self._font)
+    def bulkMove(self, ids):
+        pass  # To be modified dynamically in slots.py
+
+    def bulkRemove(self, ids):
+        pass  # To be modified dynamically in slots.py
 
 
 class FolderList(QListWidget):
@@ -234,6 +385,7 @@ class FolderList(QListWidget):
         super().__init__()
         self.setFixedWidth(300)
         self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setSelectionMode(QAbstractItemView.ExtendedSelection)
         self.setStyleSheet('''
         QListWidget {
             background-color: rgba(0, 0, 0, 0);
@@ -249,18 +401,24 @@ class FolderList(QListWidget):
         }
         ''')
 
-    def refresh(self, folderCards=None):
-        if folderCards is None:
-            folderCards = self.content
+    def refresh(self, rows):
+        # rows are catalog.FolderRow, every card is built once here
         self.clear()
-        self.content = [i.clone() for i in folderCards]
+        self.content = [FolderCard(row) for row in rows]
+        # Every item goes in before any widget, adding items next to item widgets costs time for each widget there
+        items = []
         for i in self.content:
-            item = QListWidgetItem(self)
+            item = QListWidgetItem()
             item.setSizeHint(QSize(0, 70))
             item.id = i.id
             self.addItem(item)
+            items.append(item)
+        for item, i in zip(items, self.content):
             self.setItemWidget(item, i)
 
+    def selectedIds(self):
+        return [item.id for item in self.selectedItems()]
+
 
 class AppList(QScrollArea):
     content = []
@@ -276,12 +434,20 @@ class AppList(QScrollArea):
         self.setWidgetResizable(True)
         self.layout.setSpacing(50)
         self.setStyleSheet("background-color: rgba(0, 0, 0, 0)")
-
-    def refresh(self, appCards=None):
-        if appCards is None:
-            appCards = self.content
-        clear_layout(self.layout)
-        self.content = [i.clone() for i in appCards]
+        self.frozen = False  # Set while the window is being resized, see MainWindow.endDrag
+        self.layoutTimer = QTimer(self)
+        self.layoutTimer.setSingleShot(True)
+        self.layoutTimer.timeout.connect(self.refresh)
+
+    def refresh(self, rows=None):
+        # rows are catalog.AppRow and build the cards once, without rows the cards there are only laid out
+        # again, which is all a resize needs
+        if rows is not None:
+            clear_layout(self.layout)
+            self.content = [AppCard(row) for row in rows]
+        else:
+            while self.layout.count():
+                self.layout.takeAt(0)
         if len(self.content) == 0:
             return
         num_per_row = self.width() // (self.content[0].width() + self.layout.spacing())
@@ -289,9 +455,13 @@ class AppList(QScrollArea):
             self.layout.addWidget(appCard, i // num_per_row, i % num_per_row)
         self.widget.setLayout(self.layout)
 
+    def selectedIds(self):
+        return [i.id for i in self.content if i.isSelected]
+
     def resizeEvent(self, event):
         super().resizeEvent(event)
-        QTimer.singleShot(100, self.refresh)  # Idk why but without this is will be strange ()
+        if not self.frozen:
+            self.layoutTimer.start(100)  # Idk why but without this is will be strange ()
 
 
 class MenuItem(QPushButton):
@@ -358,8 +528,18 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(self.canvas)
         self.layout = QHBoxLayout(self.canvas)
         self.subWindow = None
-        self.pixmap = QPixmap(setting.background)
+        self.pixmap = QPixmap()  # setting.background decoded at the window size, see loadBackground
         self.resize_needed = True
+        self.backgroundTimer = QTimer(self)
+        self.backgroundTimer.setSingleShot(True)
+        self.backgroundTimer.timeout.connect(self.loadBackground)
+
+        # Drag geometry is applied at most once per display frame, see scheduleGeometry
+        self.pendingGeometry = None
+        self.frameTimer = QTimer(self)
+        self.frameTimer.setSingleShot(True)
+        self.frameTimer.setTimerType(Qt.PreciseTimer)
+        self.frameTimer.timeout.connect(self.applyGeometry)
 
         self.setMouseTracking(True)
         self.setAttribute(Qt.WA_TranslucentBackground)
@@ -426,10 +606,10 @@ class MainWindow(QMainWindow):
         self.menu.items[1].clicked.connect(self.addApp)
         self.menu.items[2].clicked.connect(self.addFolder)
         self.menu.items[3].clicked.connect(self.setting)
-
-        if sys.platform == 'win32':
-            self.menu.addItem(MenuItem('📥', 4, self))
-            self.menu.items[4].clicked.connect(self.import_)
+        self.menu.addItem(MenuItem('🚀', 4, self))
+        self.menu.items[4].clicked.connect(self.launchGroup)
+        self.menu.addItem(MenuItem('📥', 5, self))
+        self.menu.items[5].clicked.connect(self.import_)
 
         self.menu.hide()
 
@@ -471,11 +651,21 @@ class MainWindow(QMainWindow):
         self.subWindow = Import()
         self.subWindow.show()
 
+    def launchGroup(self):
+        pass  # To be modified dynamically in slots.py
+
+    def loadBackground(self):
+        self.pixmap = images.load(setting.background, self.width(), self.height(), Qt.KeepAspectRatioByExpanding)
+        self.update()
+
     def paintEvent(self, event):
         painter = QPainter(self)
         painter.setRenderHint(QPainter.Antialiasing, True)
 
-        bgPixmap = self.pixmap.scaled(self.size(), Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation)
+        bgPixmap = self.pixmap
+        if not bgPixmap.isNull() and (bgPixmap.width() < self.width() or bgPixmap.height() < self.height()):
+            # Stretch the previous background until loadBackground decodes one for the new size
+            bgPixmap = bgPixmap.scaled(self.size(), Qt.KeepAspectRatioByExpanding, Qt.FastTransformation)
         startX = (self.width() - bgPixmap.width()) / 2
         startY = (self.height() - bgPixmap.height()) / 2
 
@@ -499,13 +689,45 @@ class MainWindow(QMainWindow):
                 self.setCursor(Qt.CursorShape.ArrowCursor)
         elif event.buttons() == Qt.MouseButton.LeftButton:
             if self.edge_press.moveEdgePress:
-                self.move(event.globalPosition().toPoint() - self.edge_press.movePosition)
+                self.scheduleGeometry(QRect(event.globalPosition().toPoint() - self.edge_press.movePosition,
+                                            self.size()))
             elif self._get_edge_press() is not Edge.NoEdge:
                 self._resize_window(event.globalPosition().toPoint() - self.pos())
 
+    def scheduleGeometry(self, geometry):
+        # Mice can report over 1000 moves per second, only the latest one matters when the next frame is drawn
+        self.pendingGeometry = geometry
+        if not self.frameTimer.isActive():
+            rate = self.screen().refreshRate() or 60
+            self.frameTimer.start(max(1, int(1000 / rate)))
+
+    def applyGeometry(self):
+        geometry = self.pendingGeometry
+        self.pendingGeometry = None
+        if geometry is None:
+            return
+        if geometry.size() == self.size():
+            self.move(geometry.topLeft())
+        else:
+            self.setGeometry(geometry)
+
+    def startResize(self):
+        # Card layout and smooth background scaling wait until the drag ends
+        self.appList.frozen = True
+
+    def endDrag(self):
+        self.frameTimer.stop()
+        self.applyGeometry()
+        if self.appList.frozen:
+            self.appList.frozen = False
+            self.appList.refresh()
+            self.loadBackground()
+
     def mousePressEvent(self, event) -> None:
         pos = event.globalPosition().toPoint() - self.pos()
         edges = self._get_edges(pos)
+        if edges not in (Edge.NoEdge, None):
+            self.startResize()
         if edges == Edge.LeftEdge:
             self.edge_press.leftEdgePress = True
         elif edges == Edge.RightEdge:
@@ -539,6 +761,7 @@ class MainWindow(QMainWindow):
         self.edge_press.rightTopEdgePress = False
         self.edge_press.moveEdgePress = False
         self.setCursor(Qt.CursorShape.ArrowCursor)
+        self.endDrag()
 
     def _get_move_edges(self, pos):
         in_move_edge: bool = pos.y() <= self.move_event_height
@@ -656,11 +879,13 @@ class MainWindow(QMainWindow):
             height = pos.y()
             if height <= self.min_height:
                 height = geo.height()
-        self.setGeometry(x, y, width, height)
+        self.scheduleGeometry(QRect(x, y, width, height))
 
     def resizeEvent(self, event):
         self.menu.updatePosition()
-        self.setCursor(Qt.CursorShape.ArrowCursor)
+        if not self.appList.frozen:
+            self.setCursor(Qt.CursorShape.ArrowCursor)
+            self.backgroundTimer.start(100)
 
 
 class AddFolderWindow(QWidget):
@@ -831,10 +1056,20 @@ class Import(QWidget):
         self.path.setFixedWidth(300)
         self.path.setDragEnabled(True)
         self.path.setAcceptDrops(True)
+        if sys.platform == 'linux':
+            self.path.setPlaceholderText("Empty for the installed applications")
+        # Directory levels that become folders, deeper directories are merged into them
+        self.depthTitle = QLabel("Depth: ")
+        self.depth = QSpinBox()
+        self.depth.setRange(0, 99)
+        self.depth.setValue(1)
+        self.depth.setSpecialValueText("All")
         self.saveButton = QPushButton("Save")
 
         self.layout.addWidget(self.title)
         self.layout.addWidget(self.path)
+        self.layout.addWidget(self.depthTitle)
+        self.layout.addWidget(self.depth)
         self.layout.addWidget(self.saveButton)
 
         self.saveButton.clicked.connect(self.saveData)
@@ -938,6 +1173,154 @@ class ModifyAppWindow(QWidget):
         self.lineEdits.addWidget(self.column3)
         self.lineEdits.addWidget(self.column4)
 
+        # Launch policy, empty fields are not applied
+        self.policyTitles = QHBoxLayout()
+        self.title5 = QLabel("CPU Affinity")
+        self.title6 = QLabel("Nice")
+        self.title7 = QLabel("I/O Priority")
+        self.title8 = QLabel("cgroup")
+        self.title9 = QLabel("Working Directory")
+        self.title5.setFixedWidth(150)
+        self.title6.setFixedWidth(300)
+        self.title7.setFixedWidth(300)
+        self.title8.setFixedWidth(300)
+        self.title9.setFixedWidth(300)
+        self.policyTitles.addWidget(self.title5)
+        self.policyTitles.addWidget(self.title6)
+        self.policyTitles.addWidget(self.title7)
+        self.policyTitles.addWidget(self.title8)
+        self.policyTitles.addWidget(self.title9)
+
+        self.policyEdits = QHBoxLayout()
+        cpu_affinity, nice, ioprio, cgroup, working_dir = parent.policy
+        self.column5 = QLineEdit(cpu_affinity if cpu_affinity else '')
+        self.column6 = QLineEdit(str(nice) if nice is not None else '')
+        self.column7 = QLineEdit(ioprio if ioprio else '')
+        self.column8 = QLineEdit(cgroup if cgroup else '')
+        self.column9 = QLineEdit(working_dir if working_dir else '')
+        self.column5.setPlaceholderText("0-3,6")
+        self.column6.setPlaceholderText("-20 to 19")
+        self.column7.setPlaceholderText("idle, best-effort:4 or realtime:0")
+        self.column8.setPlaceholderText("/sys/fs/cgroup/games")
+        self.column9.setPlaceholderText("Directory the app starts in")
+        self.column5.setFixedWidth(150)
+        self.column6.setFixedWidth(300)
+        self.column7.setFixedWidth(300)
+        self.column8.setFixedWidth(300)
+        self.column9.setFixedWidth(300)
+        self.policyEdits.addWidget(self.column5)
+        self.policyEdits.addWidget(self.column6)
+        self.policyEdits.addWidget(self.column7)
+        self.policyEdits.addWidget(self.column8)
+        self.policyEdits.addWidget(self.column9)
+
+        # Buttons
+        self.buttons = QHBoxLayout()
+        self.saveButton = QPushButton("Save")
+        self.buttons.addStretch()
+        self.buttons.addWidget(self.saveButton)
+
+        self.saveButton.clicked.connect(self.saveData)
+
+        # Layout
+        self.layout.addLayout(self.titles)
+        self.layout.addLayout(self.lineEdits)
+        self.layout.addLayout(self.policyTitles)
+        self.layout.addLayout(self.policyEdits)
+        self.layout.addLayout(self.buttons)
+
+    def saveData(self):
+        pass  # To be modified in slots.py
+
+
+class BulkModifyFolderWindow(QWidget):
+    def __init__(self, ids):
+        super().__init__()
+        self.setWindowTitle(f"Modify {len(ids)} Folders")
+        self.layout = QVBoxLayout()
+        self.setLayout(self.layout)
+        self.ids = ids
+
+        # Titles
+        self.titles = QHBoxLayout()
+        self.title1 = QLabel("Icon Path")
+        self.title2 = QLabel("Banner Path")
+        self.title1.setFixedWidth(300)
+        self.title2.setFixedWidth(300)
+        self.titles.addWidget(self.title1)
+        self.titles.addWidget(self.title2)
+
+        # LineEdits, empty ones are left unchanged
+        self.lineEdits = QHBoxLayout()
+        self.column1 = QLineEdit()
+        self.column2 = QLineEdit()
+        self.column1.setPlaceholderText("Unchanged")
+        self.column2.setPlaceholderText("Unchanged")
+        self.column1.setDragEnabled(True)
+        self.column1.setAcceptDrops(True)
+        self.column2.setDragEnabled(True)
+        self.column2.setAcceptDrops(True)
+        self.column1.setFixedWidth(300)
+        self.column2.setFixedWidth(300)
+        self.lineEdits.addWidget(self.column1)
+        self.lineEdits.addWidget(self.column2)
+
+        # Buttons
+        self.buttons = QHBoxLayout()
+        self.saveButton = QPushButton("Save")
+        self.buttons.addStretch()
+        self.buttons.addWidget(self.saveButton)
+
+        self.saveButton.clicked.connect(self.saveData)
+
+        # Layout
+        self.layout.addLayout(self.titles)
+        self.layout.addLayout(self.lineEdits)
+        self.layout.addLayout(self.buttons)
+
+    def saveData(self):
+        pass  # To be modified in slots.py
+
+
+class BulkModifyAppWindow(QWidget):
+    def __init__(self, ids):
+        super().__init__()
+        self.setWindowTitle(f"Modify {len(ids)} Apps")
+        self.layout = QVBoxLayout()
+        self.setLayout(self.layout)
+        self.ids = ids
+
+        # Titles
+        self.titles = QHBoxLayout()
+        self.title1 = QLabel("Background Path")
+        self.title2 = QLabel("Command")
+        self.title3 = QLabel("Parameters")
+        self.title1.setFixedWidth(300)
+        self.title2.setFixedWidth(300)
+        self.title3.setFixedWidth(300)
+        self.titles.addWidget(self.title1)
+        self.titles.addWidget(self.title2)
+        self.titles.addWidget(self.title3)
+
+        # LineEdits, empty ones are left unchanged
+        self.lineEdits = QHBoxLayout()
+        self.column1 = QLineEdit()
+        self.column2 = QLineEdit()
+        self.column3 = QLineEdit()
+        self.column1.setPlaceholderText("Unchanged")
+        self.column2.setPlaceholderText("Unchanged")
+        self.column3.setPlaceholderText("Unchanged")
+        self.column1.setDragEnabled(True)
+        self.column1.setAcceptDrops(True)
+        self.column2.setDragEnabled(True)
+        self.column2.setAcceptDrops(True)
+        self.column1.setFixedWidth(300)
+        self.column2.setFixedWidth(300)
+        self.column3.setFixedWidth(300)
+        self.lineEdits.addWidget(self.column1)
+        self.lineEdits.addWidget(self.column2)
+        self.lineEdits.addWidget(self.column3)
+
         # Buttons
         self.buttons = QHBoxLayout()
         self.saveButton = QPushButton("Save")
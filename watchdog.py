@@ -0,0 +1,50 @@
+import sys
+import time
+import threading
+import traceback
+
+from PySide6.QtCore import QObject, QTimer
+
+
+class StallWatchdog(QObject):
+    # A GUI-thread timer records heartbeats, a watcher thread notices when they stop arriving and
+    # captures the main thread's stack, the stall is logged with its duration once the GUI responds again
+    def __init__(self, threshold_ms=100, log_path='stall.log'):
+        super().__init__()
+        self.interval = threshold_ms / 2000
+        self.threshold = threshold_ms / 1000
+        self.log_path = log_path
+        self.beat = time.monotonic()
+        self.main_id = threading.main_thread().ident
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.heartbeat)
+        self.timer.start(round(self.interval * 1000))
+        self.thread = threading.Thread(target=self.watch, name='watchdog', daemon=True)
+        self.thread.start()
+
+    def heartbeat(self):
+        self.beat = time.monotonic()
+
+    def watch(self):
+        stall_start = None
+        stack = None
+        while True:
+            time.sleep(self.interval / 2)
+            beat = self.beat
+            late = time.monotonic() - beat - self.interval
+            if stall_start is None:
+                if late > self.threshold:
+                    stall_start = beat + self.interval
+                    frame = sys._current_frames().get(self.main_id)
+                    stack = ''.join(traceback.format_stack(frame)) if frame else ''
+            elif beat > stall_start:
+                self.log(beat - stall_start, stall_start, stack)
+                stall_start = None
+
+    def log(self, duration, start, stack):
+        print(f'[watchdog] GUI thread stalled for {duration * 1000:.0f}ms')
+        wall = time.time() - (time.monotonic() - start)
+        with open(self.log_path, 'a') as f:
+            f.write(f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(wall))} "
+                    f"stalled {duration * 1000:.0f}ms\n{stack}\n")
@@ -0,0 +1,22 @@
+from PySide6.QtCore import QThread, Signal
+
+
+class Worker(QThread):
+    # Runs function(*args, progress=callback, **kwargs) off the GUI thread
+    progress = Signal(int, int)
+    done = Signal(object)
+    failed = Signal(str)
+
+    def __init__(self, function, *args, **kwargs):
+        super().__init__()
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+
+    def run(self):
+        try:
+            result = self.function(*self.args, progress=self.progress.emit, **self.kwargs)
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.done.emit(result)